@@ -0,0 +1,118 @@
+import time
+import numpy as np
+import Bits
+from BFS import TOP_DOWN_RATIO
+
+BATCH = 64 # sources per sweep, one bit of a uint64 word each
+CHUNK = 2**14 # newly reached vertices unpacked at a time to bin them by Hamming distance
+
+class DistanceProfile:
+    """
+    Distance statistics of a subgraph from a multi-source BFS (MS-BFS): 64 sources are swept at once, bit i of the
+    uint64 word of vertex v saying whether source i has reached v, so one level is a handful of word operations per
+    dimension for all 64 of them. sources=None sweeps from every vertex (exact, 2^n / 64 sweeps of the cube).
+    joint[d, h] counts the ordered (source, vertex) pairs at distance d whose Hamming distance is h; the histogram,
+    average distance and stretch distributions all derive from it. Row 0 holds the sources themselves.
+    eccentricity[i] is the largest finite distance from sources[i] (its component, unreachable vertices are left out),
+    unreachable counts the (source, vertex) pairs in different components.
+    """
+
+    def __init__(self, masks, n, sources=None):
+        start = time.perf_counter()
+        self.n = n
+        self.exact = sources is None
+        self.sources = np.arange(2**n, dtype=np.int64) if sources is None else np.asarray(sources, dtype=np.int64)
+        self.eccentricity = np.zeros(len(self.sources), dtype=np.int64)
+        self.unreachable = 0
+        rows = [np.zeros(n + 1, dtype=np.int64)]
+        for i in range(0, len(self.sources), BATCH):
+            self._sweep(masks, self.sources[i:i + BATCH], self.eccentricity[i:i + BATCH], rows)
+        self.joint = np.array(rows)
+        self.sweep_time = time.perf_counter() - start
+
+    def _sweep(self, masks, sources, eccentricity, rows):
+        """One MS-BFS from up to 64 sources, adding its pairs to rows and filling in eccentricity."""
+        n, k, size = self.n, len(sources), 2**self.n
+        seen = np.zeros(size, dtype=np.uint64)
+        np.bitwise_or.at(seen, sources, np.uint64(1) << np.arange(k, dtype=np.uint64)) # a source may be listed twice
+        frontier = seen.copy()
+        reached = np.flatnonzero(frontier)
+        rows[0][0] += k
+        scratch = np.empty(size, dtype=np.uint64)
+        shifts = np.arange(k, dtype=np.uint64)
+        ids = sources.astype(masks.dtype) # vertex ids fit the mask dtype, halving the Hamming binning's traffic
+        level = 0
+        while True:
+            level += 1
+            nxt = np.zeros(size, dtype=np.uint64)
+            if reached.size * TOP_DOWN_RATIO < size: # top-down: push the few frontier words along their edges
+                reached_masks = masks[reached]
+                for dim in range(n):
+                    src = reached[(reached_masks >> masks.dtype.type(dim)) & 1 == 1]
+                    np.bitwise_or.at(nxt, src ^ (1 << dim), frontier[src])
+            else: # bottom-up: every word pulls its neighbor's word across each edge it has
+                for dim in range(n):
+                    shape = (-1, 2, 1 << dim) # axis 1 is bit dim, so [:, ::-1] is the neighbor across it
+                    np.multiply(frontier.reshape(shape)[:, ::-1], ((masks >> masks.dtype.type(dim)) & 1).reshape(shape),
+                                out=scratch.reshape(shape))
+                    nxt |= scratch
+            nxt &= ~seen
+            reached = np.flatnonzero(nxt)
+            if not reached.size:
+                break
+            seen |= nxt
+            alive = int(np.bitwise_or.reduce(nxt[reached])) # sources that reached something new at this level
+            eccentricity[(np.uint64(alive) >> shifts) & np.uint64(1) == 1] = level
+            if len(rows) == level:
+                rows.append(np.zeros(n + 1, dtype=np.int64))
+            for i in range(0, reached.size, CHUNK):
+                block = reached[i:i + CHUNK]
+                hit = np.unpackbits(nxt[block].view(np.uint8), bitorder='little').reshape(-1, 64)[:, :k].view(bool)
+                hamming = Bits.popcount(block.astype(masks.dtype)[:, None] ^ ids[None, :])
+                rows[level] += np.bincount(hamming[hit], minlength=n + 1)
+            frontier = nxt
+        self.unreachable += k * size - int(Bits.popcount(seen).sum(dtype=np.int64))
+
+    @property
+    def histogram(self):
+        """Ordered pairs per distance, index 0 being the sources themselves."""
+        return self.joint.sum(axis=1)
+
+    @property
+    def pairs(self):
+        """Ordered (source, vertex) pairs with a path between them, vertex != source."""
+        return int(self.joint[1:].sum())
+
+    @property
+    def diameter(self):
+        """Largest eccentricity. Exact when every vertex was a source, otherwise a lower bound."""
+        return int(self.eccentricity.max(initial=0))
+
+    @property
+    def average_distance(self):
+        pairs = self.pairs
+        return float(np.arange(len(self.joint)) @ self.histogram) / pairs if pairs else 0.0
+
+    @property
+    def stretch(self):
+        """
+        Connected pairs per detour d - h, the edges a path spends beyond the Hamming distance. Every edge flips one
+        bit, so d and h have the same parity and only even detours occur.
+        """
+        joint = self.joint[1:]
+        d, h = np.nonzero(joint)
+        detours = np.zeros(len(joint), dtype=np.int64)
+        np.add.at(detours, d + 1 - h, joint[d, h])
+        return detours
+
+    @property
+    def mean_stretch(self):
+        """Average of d / h over the connected pairs, 1.0 for an undamaged cube."""
+        pairs, joint = self.pairs, self.joint[1:]
+        d, h = np.nonzero(joint)
+        return float((joint[d, h] * (d + 1) / h).sum()) / pairs if pairs else 1.0
+
+    def __repr__(self):
+        return (f'DistanceProfile(sources={len(self.sources)}, exact={self.exact}, diameter={self.diameter}, '
+                f'average_distance={self.average_distance:.3f}, mean_stretch={self.mean_stretch:.3f}, '
+                f'unreachable={self.unreachable}, sweep_time={self.sweep_time:.3f}s)')
@@ -0,0 +1,51 @@
+import numpy as np
+import Bits
+
+TOP_DOWN_RATIO = 64 # expand top-down while the frontier has fewer than words / TOP_DOWN_RATIO vertices
+
+def distance_field(masks, n, source, edges=None):
+    """
+    Level-synchronous BFS over the whole cube. masks holds one n-bit edge mask per vertex (Graph.edge_masks()).
+    The frontier and visited set are packed bitsets; each level either pushes the frontier's set bits along their
+    edges (top-down, while the frontier is small) or lets every unvisited word pull from its neighbors in the
+    frontier with shift/XOR/AND word operations (bottom-up, once the frontier is large).
+    Returns an array of distances from source, uint8 while distances fit and uint16/uint32 beyond that.
+    Unreachable vertices hold the dtype's maximum value. O(n2^n) worst case, vectorized.
+    edges (Bits.edge_bitsets(masks, n)) can be passed in to share them between many sources.
+    """
+    if edges is None:
+        edges = Bits.edge_bitsets(masks, n)
+    words = Bits.num_words(n)
+    dist = np.full(2**n, np.iinfo(np.uint8).max, dtype=np.uint8)
+    frontier = np.zeros(words, dtype=np.uint64)
+    Bits.set_bits(frontier, [source])
+    visited = frontier.copy()
+    dist[source] = 0
+    frontier_size, level = 1, 0
+    while frontier_size:
+        level += 1
+        if level == np.iinfo(dist.dtype).max: # widen before the level collides with the unreachable marker
+            wider = np.uint16 if dist.dtype == np.uint8 else np.uint32
+            unreached = dist == np.iinfo(dist.dtype).max
+            dist = dist.astype(wider)
+            dist[unreached] = np.iinfo(wider).max
+        if frontier_size * TOP_DOWN_RATIO < words: # top-down: expand the few frontier vertices directly
+            fv = Bits.indices(frontier)
+            fv_masks = masks[fv]
+            nxt = np.zeros(words, dtype=np.uint64)
+            for dim in range(n):
+                src = fv[(fv_masks >> masks.dtype.type(dim)) & 1 == 1]
+                Bits.set_bits(nxt, src ^ np.uint64(1 << dim))
+            nxt &= ~visited
+        else: # bottom-up: unvisited words check all their neighbors against the frontier
+            active = np.flatnonzero(~visited)
+            pulled = np.zeros(active.size, dtype=np.uint64)
+            for dim in range(n):
+                pulled |= edges[dim][active] & Bits.flip(frontier, dim, at=active)
+            nxt = np.zeros(words, dtype=np.uint64)
+            nxt[active] = pulled & ~visited[active]
+        new = Bits.indices(nxt)
+        dist[new] = level
+        visited |= nxt
+        frontier, frontier_size = nxt, new.size
+    return dist
@@ -0,0 +1,85 @@
+import numpy as np
+
+POPCOUNT_8 = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8) # popcount of every byte
+
+def mask_dtype(n):
+    """Smallest unsigned dtype wide enough to hold an n-bit edge mask."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if np.dtype(dtype).itemsize * 8 >= n:
+            return np.dtype(dtype)
+    raise ValueError(f'{n} dimensions do not fit in a 64 bit edge mask')
+
+def popcount(a):
+    """Elementwise hamming weight of an unsigned integer array."""
+    a = np.ascontiguousarray(a)
+    if hasattr(np, 'bitwise_count'): # numpy >= 2.0
+        return np.bitwise_count(a)
+    return POPCOUNT_8[a.view(np.uint8)].reshape(a.shape + (a.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+def hypercube_table(n):
+    """
+    (2^n, n) neighbor table of the full n-cube: row v holds v with each bit flipped, most significant bit first,
+    i.e. the same order Graph has always listed neighbors in. Built in one shot with a broadcast XOR.
+    """
+    dtype = mask_dtype(n) # an n-bit vertex id fits wherever an n-bit mask does
+    flips = (1 << np.arange(n - 1, -1, -1, dtype=np.uint64)).astype(dtype)
+    return np.arange(2**n, dtype=dtype)[:, None] ^ flips
+
+def edge_list(masks, n):
+    """Both endpoints of every present edge, each edge once (lows have the flipped bit clear)."""
+    dtype = mask_dtype(max(n, 1))
+    vertices = np.arange(2**n, dtype=dtype)
+    lows, highs = [], []
+    for dim in range(n):
+        bit = dtype.type(1 << dim)
+        low = vertices[((masks >> masks.dtype.type(dim)) & 1 == 1) & (vertices & bit == 0)]
+        lows.append(low)
+        highs.append(low | bit)
+    return np.concatenate(lows or [vertices[:0]]), np.concatenate(highs or [vertices[:0]])
+
+# Bitsets: bit v of a bitset over the 2^n vertices is bit v & 63 of the uint64 word v >> 6.
+FLIP_MASKS = [np.uint64(m) for m in (0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F,
+                                     0x00FF00FF00FF00FF, 0x0000FFFF0000FFFF, 0x00000000FFFFFFFF)] # bits whose position has bit b clear
+
+def num_words(n):
+    return max(1, 2**n // 64)
+
+def pack(bits):
+    """Packs a bool array over the vertices into a bitset."""
+    bits = np.asarray(bits, dtype=bool)
+    if bits.size % 64:
+        bits = np.concatenate([bits, np.zeros(64 - bits.size % 64, dtype=bool)])
+    return np.packbits(bits, bitorder='little').view('<u8').astype(np.uint64, copy=False)
+
+def set_bits(words, vertices):
+    """Sets the bits of the given vertices in place."""
+    vertices = np.asarray(vertices, dtype=np.uint64)
+    np.bitwise_or.at(words, vertices >> np.uint64(6), np.uint64(1) << (vertices & np.uint64(63)))
+
+def indices(words):
+    """Sorted vertices whose bit is set."""
+    nonzero = np.flatnonzero(words)
+    bits = np.unpackbits(words[nonzero].astype('<u8').view(np.uint8), bitorder='little').reshape(-1, 64)
+    rows, cols = np.nonzero(bits)
+    return nonzero[rows].astype(np.uint64) * np.uint64(64) + cols.astype(np.uint64)
+
+def count(words):
+    return int(popcount(words).sum(dtype=np.int64))
+
+def flip(words, dim, at=None):
+    """
+    The bitset with every vertex v moved to v ^ (1 << dim). With at (word indices) only those words of the
+    result are computed. Dimensions below 6 swap bits inside a word, higher ones swap whole words.
+    """
+    if dim < 6:
+        x = words if at is None else words[at]
+        s, m = np.uint64(1 << dim), FLIP_MASKS[dim]
+        return ((x & m) << s) | ((x >> s) & m)
+    k = 1 << (dim - 6)
+    if at is None:
+        return words.reshape(-1, 2, k)[:, ::-1, :].reshape(-1)
+    return words[at ^ k]
+
+def edge_bitsets(masks, n):
+    """One bitset per dimension: bit v of edge_bitsets[dim] is set iff the edge v -- v ^ (1 << dim) is present."""
+    return [pack((masks >> masks.dtype.type(dim)) & 1) for dim in range(n)]
@@ -0,0 +1,50 @@
+import numpy as np
+from Bits import edge_list, mask_dtype
+
+def label_components(masks, n):
+    """
+    Vectorized union-find. Each round hooks the larger root of every edge whose endpoints disagree under the
+    smallest root it touches, then pointer-jumps until every vertex points straight at its root. Edges whose
+    endpoints already agree are dropped for good, so the rounds get cheaper as components merge.
+    Returns, for every vertex, the smallest vertex of its component.
+    """
+    parent = np.arange(2**n, dtype=mask_dtype(max(n, 1)))
+    u, v = edge_list(masks, n)
+    while True:
+        pu, pv = parent[u], parent[v]
+        differ = pu != pv
+        if not differ.any():
+            return parent
+        u, v, pu, pv = u[differ], v[differ], pu[differ], pv[differ]
+        np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv)) # hook, parents only ever decrease
+        while True:
+            grandparent = parent[parent]
+            if (grandparent == parent).all():
+                break
+            parent = grandparent
+
+class ComponentIndex:
+    """
+    Connected components of a Graph's subgraph at one version. labels[v] is the smallest vertex in v's
+    component, so connected(u, v) is a single comparison.
+    """
+
+    def __init__(self, masks, n, version=0):
+        self.n = n
+        self.version = version # Graph.version the labels were computed at
+        self.labels = label_components(masks, n)
+        self.roots, self.sizes = np.unique(self.labels, return_counts=True)
+
+    @property
+    def count(self):
+        return len(self.roots)
+
+    def connected(self, u, v):
+        return self.labels[u] == self.labels[v]
+
+    def size(self, v):
+        """Number of vertices in v's component."""
+        return int(self.sizes[np.searchsorted(self.roots, self.labels[v])])
+
+    def largest(self):
+        return int(self.sizes.max())
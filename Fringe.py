@@ -12,7 +12,8 @@ class Fringe:
     def push(self, v, d):
         if v in self.fringe_tuple_dict:
             self.fringe_tuple_dict[v].outdated = True
-        heapq.heappush(self.heap, FringeTuple(v, d))
+        self.fringe_tuple_dict[v] = FringeTuple(v, d)
+        heapq.heappush(self.heap, self.fringe_tuple_dict[v])
         
     def pop(self):
         while self.heap:
@@ -36,4 +37,57 @@ class FringeTuple:
         
         def __eq__(self, other):
             return self.vertex == other.vertex
-    
\ No newline at end of file
+    
+class BucketFringe:
+    """
+    Monotone bucket queue (Dial's algorithm) for small integer priorities, which is all a hypercube search needs.
+    buckets[d] holds the vertices whose current priority is d, and pop scans forward from the last popped priority.
+    Vertices are only inserted once they are reached, and decrease-key moves a vertex between buckets in O(1),
+    so no outdated entries are ever left behind. Within a bucket, the most recently pushed vertex pops first.
+    """
+
+    def __init__(self):
+        self.buckets = [] # priority : {vertex : None}, an insertion ordered set
+        self.priority = {} # vertex : current priority
+        self.cursor = 0 # no non-empty bucket below this priority
+
+    def __bool__(self):
+        return bool(self.priority)
+
+    def __len__(self):
+        return len(self.priority)
+
+    def __contains__(self, v):
+        return v in self.priority
+
+    def push(self, v, d):
+        """Inserts v with priority d, or moves it to d if it is already queued."""
+        if v in self.priority:
+            del self.buckets[self.priority[v]][v]
+        while len(self.buckets) <= d:
+            self.buckets.append({})
+        self.buckets[d][v] = None
+        self.priority[v] = d
+        if d < self.cursor: # only happens with an inconsistent heuristic, stay correct anyway
+            self.cursor = d
+
+    def pop(self):
+        """Removes and returns a vertex with the smallest priority, or None if the fringe is empty."""
+        if not self.priority:
+            return None
+        while not self.buckets[self.cursor]:
+            self.cursor += 1
+        v, _ = self.buckets[self.cursor].popitem()
+        del self.priority[v]
+        return v
+
+    def min_priority(self):
+        """Smallest queued priority, or infinity if the fringe is empty."""
+        if not self.priority:
+            return float('inf')
+        while not self.buckets[self.cursor]:
+            self.cursor += 1
+        return self.cursor
+
+    def remove(self, v):
+        del self.buckets[self.priority.pop(v)][v]
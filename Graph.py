@@ -1,70 +1,234 @@
 import random
-from Fringe import Fringe
+from collections import OrderedDict
+import numpy as np
+import Bits
+import GraphIO
+from Analysis import DistanceProfile
+from BFS import distance_field
+from Components import ComponentIndex
+from Fringe import BucketFringe
+from Landmarks import Landmarks
 from Node import Node
+from PathResult import PathResult, WalkResult, trace
+from Stats import SearchStats
+from Storage import NodeStorage, MaskStorage, ImplicitStorage, OverlayStorage
+
+ENGINES = {'dict': NodeStorage, 'mask': MaskStorage, 'implicit': ImplicitStorage}
+FIELD_LIMIT = 2**24 # largest cube swept whole (distance fields, edge lists), bigger cubes only run local searches
+FIELD_RATIO = 128 # a distance field costs about as much as 2^n / FIELD_RATIO + FIELD_RATIO A* expansions
+IDA_TABLE_SIZE = 2**20 # default transposition table size (vertices) of shortest_path(ida=True)
 
 class Graph:
     """
-    An undirected Hypercube graph. Generates a 15 dimensional hypercube (32768 nodes) in around 5 seconds.
+    An undirected Hypercube graph. Generates a 15 dimensional hypercube (32768 nodes) in well under a second.
+    engine selects how adjacency is stored: 'dict' (Node objects, the default), 'mask' (one n-bit edge mask
+    per vertex, far smaller) or 'implicit' (only removed edges are stored, for 30-48+ dimensional cubes).
+    All engines give identical results for the same seed.
     Example:
     g = Graph(15)
     g.subgraph(75000)
     g.shortest_path('000000000000000', '111111111111111')
-    >>> "edges: 17, path: ['000000000000000', '100000000000000', '110000000000000', 
-    '110100000000000', '110110000000000', '111110000000000', 
-    '111111000000000', '111111100000000', '111111110000000', 
-    '111111111000000', '111111111100000', '111111111110000', 
-    '111111111111000', '111111111111100', '011111111111100', 
+    >>> "edges: 17, path: ['000000000000000', '100000000000000', '110000000000000',
+    '110100000000000', '110110000000000', '111110000000000',
+    '111111000000000', '111111100000000', '111111110000000',
+    '111111111000000', '111111111100000', '111111111110000',
+    '111111111111000', '111111111111100', '011111111111100',
     '011111111111110', '111111111111110', '111111111111111']"
     """
 
-    def __init__(self, n, seed=0):
-        self.nodes_adjacency = {} # Node : neighbors[Node]
-        self.decimal_Node_dict = {} # decimal value : Node
+    def __init__(self, n, seed=0, engine='dict', storage=None):
+        """storage wraps an existing storage engine (e.g. a snapshot overlay) instead of building a fresh cube."""
+        if engine not in ENGINES:
+            raise ValueError(f'unknown engine {engine!r}, expected one of {list(ENGINES)}')
+        self.engine = engine
+        self.seed = seed
         self.rand = random.Random(seed)
-        self.graph(n)
+        self.np_rand = None # NumPy generator for the vectorized generators, seeded on first use
+        if storage is None:
+            self.graph(n)
+        else:
+            self.storage = storage
         self.n = n
-        
+        self.frozen = False # set once snapshots share this graph's storage
+        self.nodes_expanded = 0 # nodes expanded by the last shortest_path search
+        self.version = 0 # bumped whenever edges are removed
+        self.component_index = None # built on the first call to components()
+        self.landmark_index = None # built by landmarks(), then used by shortest_path's A*
+        self.listeners = [] # listener(lows, highs) is called with every batch of removed edges, see Planner
+
     def graph(self, n):
         """O(n2^n)"""
-        self.decimal_Node_dict = {d : Node(d, n) for d in range(2**n)}
-        for node_val in self.decimal_Node_dict: # loop through nodes
-            node_neighbors = []
-            for i in range(n): # loop through bits
-                exponent = n - 1 - i
-                node = self.decimal_Node_dict[node_val] # O(1)
-                neighbor_val = node_val + [1, -1][eval(node.bitstr[i])]*(2**exponent) # [-1, 1][ith bit value]: if 0, then 1 (flip 0 to 1) and if 1, then -1 (flip 1 to 0)
-                neighbor_node = self.decimal_Node_dict[neighbor_val] # O(1)
-                node_neighbors.append(neighbor_node) # append to neighbors list
-            self.nodes_adjacency[node] = node_neighbors # update graph
-                 
-    def path(self, start_bitstr, end_bitstr):
+        self.storage = ENGINES[self.engine](n)
+
+    def snapshot(self, seed=0):
+        """
+        A copy-on-write Graph over this graph's storage, created in microseconds. The snapshot records only the edges
+        it removes itself, so many damaged variants can share one base. The base is frozen from then on.
+        Example:
+        base = Graph(15, engine='mask')
+        trials = [base.snapshot(seed) for seed in range(1000)]
+        trials[0].subgraph(75000)
+        """
+        self.frozen = True
+        return Graph(self.n, seed, self.engine, OverlayStorage(self.storage))
+
+    def save(self, path):
+        """Writes the current subgraph to path in the binary GraphIO format (header + one edge mask per vertex)."""
+        GraphIO.write_masks(path, self.edge_masks(), self.n, self.seed, self.storage.num_edges())
+
+    @classmethod
+    def load(cls, path, mode='r'):
+        """
+        Opens a file written by save on the 'mask' engine, memory-mapped so that loading is instant and pages are read
+        lazily. With the default read-only mode many processes can share one file; the graph is frozen, so damage it
+        through snapshot(). mode='c' maps the file copy-on-write, so removals stay private to this process (save again
+        to keep them).
+        """
+        if mode not in ('r', 'c'):
+            raise ValueError(f"mode must be 'r' or 'c', not {mode!r}")
+        n, seed, edge_count, masks = GraphIO.open_masks(path, mode)
+        graph = cls(n, seed, 'mask', MaskStorage(n, masks, edge_count))
+        graph.frozen = mode == 'r'
+        return graph
+
+    def write_adjacency(self, f, format='text'):
+        """
+        Streams the adjacency to f (a path or file object) in chunks, so memory stays flat however large the cube.
+        format='text' writes the same `bitstr: nbr, nbr` lines as __repr__, format='binary' a compact edge list.
+        """
+        GraphIO.write_adjacency(self.storage, self.n, self.seed, f, format)
+
+    @classmethod
+    def read_adjacency(cls, f, format='text', seed=0):
+        """Reads a stream written by write_adjacency into a 'mask' engine Graph. Binary streams carry their own seed."""
+        n, stored_seed, masks = GraphIO.read_adjacency(f, format)
+        seed = seed if stored_seed is None else stored_seed
+        return cls(n, seed, 'mask', MaskStorage(n, masks))
+
+    def _mutate(self):
+        """Called before any edge removal."""
+        if self.frozen:
+            raise ValueError('this graph is frozen (the base of snapshots or a read-only file), damage a snapshot() instead')
+        self.version += 1
+
+    def _removed(self, lows, highs):
+        """Called after the edges lows[i] -- highs[i] (arrays of vertex values) were removed."""
+        for listener in self.listeners:
+            listener(lows, highs)
+
+    def _generator(self):
+        if self.np_rand is None:
+            self.np_rand = np.random.default_rng(self.seed)
+        return self.np_rand
+
+    @property
+    def nodes_adjacency(self):
+        return self.storage.nodes_adjacency # only the 'dict' engine keeps Node objects
+
+    @property
+    def decimal_Node_dict(self):
+        return self.storage.decimal_Node_dict
+
+    def bitstr(self, v):
+        return format(v, f'0{self.n}b')
+
+    def node(self, v):
+        """Node view of vertex v (an int or a bitstring), made on demand whatever the engine."""
+        return Node(self._vertex(v), self.n)
+
+    def edge_masks(self):
+        """One n-bit edge mask per vertex: bit i of edge_masks()[v] is set iff v -- v ^ (1 << i) is an edge."""
+        return self.storage.edge_masks()
+
+    def distances(self, source_bitstr):
+        """Distances from source to every vertex via the bitset BFS engine (see BFS.distance_field)."""
+        return distance_field(self._materialized_masks(), self.n, int(source_bitstr, 2))
+
+    def components(self):
+        """
+        Connected-component index of the current subgraph, O(n2^n) vectorized. Once built, path and shortest_path
+        reject unreachable targets in O(1); the index is rebuilt lazily on the next use after edges change.
+        """
+        if self.component_index is None or self.component_index.version != self.version:
+            self.component_index = ComponentIndex(self._materialized_masks(), self.n, self.version)
+        return self.component_index
+
+    def landmarks(self, k=8, method='farthest'):
+        """
+        Precomputes k landmarks (one whole-cube BFS each, k rows of distances per vertex) so that shortest_path's A*
+        uses the max of the Hamming and landmark lower bounds, see Landmarks. They stay in use, and admissible, as
+        edges are removed later; call landmarks() again to tighten them, or set landmark_index to None to drop them.
+        Returns the Landmarks, which report build_time and bytes_per_landmark.
+        """
+        rng = np.random.default_rng(self.seed) # separate from _generator(), so damage draws stay reproducible
+        self.landmark_index = Landmarks(self._materialized_masks(), self.n, k, method, rng, self.version)
+        return self.landmark_index
+
+    def distance_profile(self, samples=None, sources=None):
+        """
+        Distance histogram, eccentricities, diameter and stretch over the Hamming metric of the current subgraph,
+        from a 64-source bit-parallel BFS (see Analysis.DistanceProfile). Every vertex is a source by default (exact,
+        2^n / 64 sweeps); samples=K draws K distinct sources seeded like landmarks(), or pass sources (bitstrings or
+        vertex values) directly. Sampled diameters are lower bounds.
+        """
+        if sources is not None:
+            sources = [self._vertex(v) for v in sources]
+        elif samples is not None:
+            rng = np.random.default_rng(self.seed)
+            sources = np.sort(rng.choice(2**self.n, size=min(samples, 2**self.n), replace=False))
+        return DistanceProfile(self._materialized_masks(), self.n, sources)
+
+    def _unreachable(self, s_d, t_d):
+        return self.component_index is not None and not self.components().connected(s_d, t_d)
+
+    def path(self, start_bitstr, end_bitstr, stats=False, fast=False):
         """
         Finds a path from start node to end node. Robust against missing edges.
+        Returns a WalkResult, whose str() is 'edges: N, path: [...]' or 'no path'.
+        fast=True ranks moves by the bits that actually differ from the target (see _fast_greedy); it finds different,
+        usually shorter, paths than the default, which is kept as is for existing callers.
+        stats=True (or a SearchStats) returns (result, SearchStats) instead, see Stats.SearchStats.
         """
 
-        current_node = self.decimal_Node_dict[int(start_bitstr, 2)]
-        end_node = self.decimal_Node_dict[int(end_bitstr, 2)]
+        stats = SearchStats() if stats is True else stats or None
+        current_node = int(start_bitstr, 2)
+        end_node = int(end_bitstr, 2)
+        if stats is not None:
+            stats.start()
+        greedy = self._fast_greedy if fast else self._greedy
+        ordered_path = None if self._unreachable(current_node, end_node) else greedy(current_node, end_node, stats)
+        if stats is not None:
+            stats.searched()
+        result = WalkResult(int(start_bitstr, 2), end_node, ordered_path, self.n)
+        if stats is None:
+            return result
+        stats.reconstructed()
+        return result, stats
 
+    def _greedy(self, current_node, end_node, stats=None):
+        """Returns the list of vertices on the path found by path, or None."""
+        end_weight = end_node.bit_count()
         ordered_path = [current_node]
         unordered_path = set(ordered_path) # use to check contains
         dead_ends = set()
-        
+        get_neighbors = self.storage.neighbors if stats is None else stats.counted_neighbors(self.storage.neighbors)
+
         while not current_node == end_node: # until we reach our target
-            neighbors = self.nodes_adjacency[current_node] # neighbors list
+            neighbors = get_neighbors(current_node) # neighbors list
             if len(ordered_path) == 1 and all(neighbor in dead_ends for neighbor in neighbors) or not neighbors: # @ start with nowhere to go
-                return 'no path'
-            
+                break
+
             # find optimal node to traverse to
             best_valid_node = None
             best_valid_node_difference = 1e100
             for neighbor_node in neighbors:
-                better_distance = abs(end_node.hamming_weight - neighbor_node.hamming_weight) < best_valid_node_difference
+                better_distance = abs(end_weight - neighbor_node.bit_count()) < best_valid_node_difference
                 valid = neighbor_node not in dead_ends and neighbor_node not in unordered_path
                 if better_distance and valid:
                     best_valid_node = neighbor_node
-                    best_valid_node_difference = abs(end_node.hamming_weight - neighbor_node.hamming_weight)
+                    best_valid_node_difference = abs(end_weight - neighbor_node.bit_count())
 
-            if best_valid_node: # traverse
+            if best_valid_node is not None: # traverse
                 ordered_path.append(best_valid_node)
                 unordered_path.add(best_valid_node)
                 current_node = best_valid_node
@@ -73,69 +237,401 @@ class Graph:
                 unordered_path.remove(current_node)
                 ordered_path.pop()
                 current_node = ordered_path[-1]
-            
-        return f'edges: {len(ordered_path)-1}, path: {list(map(lambda node: node.bitstr, ordered_path))}' # return bit strings along the path
 
-    def subgraph(self, num_edges):
+        if stats is not None:
+            stats.backtracks = stats.dead_ends = len(dead_ends) # every back up marks exactly one dead end
+        return ordered_path if current_node == end_node else None
+
+    def _fast_greedy(self, s_d, t_d, stats=None):
+        """
+        Greedy walk over edge masks: from c, the free moves are the set bits of edge_mask(c), and the ones inside
+        c ^ t_d each bring the walk one step closer to t_d, so they are tried first (highest bit first). Other bits
+        are detours, only taken when every closer move is blocked. Vertices are marked ON_PATH or DEAD in a byte map
+        (a dict past FIELD_LIMIT vertices), so the walk never revisits either, and a vertex with no free move is a
+        dead end to back up from. Returns the list of vertices on the path, or None.
+        """
+        edge_mask = self.storage.edge_mask if stats is None else stats.counted_masks(self.storage.edge_mask)
+        ON_PATH, DEAD = 1, 2
+        state = bytearray(2**self.n) if 2**self.n <= FIELD_LIMIT else {} # vertex : 0 (or absent), ON_PATH or DEAD
+        marked = state.__getitem__ if isinstance(state, bytearray) else state.get # probing never adds dict entries
+        state[s_d] = ON_PATH
+        path = [s_d]
+        c_d = s_d
+        backtracks = 0
+        while c_d != t_d:
+            mask, diff = edge_mask(c_d), c_d ^ t_d
+            next_d = None
+            for moves in (mask & diff, mask & ~diff): # closer moves, then detours
+                while moves:
+                    bit = 1 << (moves.bit_length() - 1)
+                    if not marked(c_d ^ bit):
+                        next_d = c_d ^ bit
+                        break
+                    moves ^= bit
+                if next_d is not None:
+                    break
+            if next_d is not None: # step
+                state[next_d] = ON_PATH
+                path.append(next_d)
+                c_d = next_d
+            else: # back up
+                state[c_d] = DEAD
+                path.pop()
+                backtracks += 1
+                if not path: # the start itself is a dead end
+                    break
+                c_d = path[-1]
+        if stats is not None:
+            stats.backtracks = stats.dead_ends = backtracks
+        return path or None
+
+    def subgraph(self, num_edges, vectorized=False):
         """
         Generates a subgraph of this graph with num_edges number of edges removed. Randomly picks nodes from which to remove edges.
         If a node has no edges, moves onto the next node (taking advantage of for loop generator properties) until all edges are gone.
+        vectorized=True instead draws exactly num_edges distinct present edges in one step from a NumPy generator seeded
+        like self.rand, and clears them in bulk. It is reproducible per seed, but picks different edges than the default
+        sampler, which is kept so that experiments run with random.Random(seed) still reproduce.
         """
-        
-        if num_edges > len([node for neighbors in self.nodes_adjacency.values() for node in neighbors]) // 2:
+
+        if num_edges > self.storage.num_edges():
             return 'not enough edges'
 
+        self._mutate()
+        if vectorized:
+            lows, highs = self._sample_edges(int(num_edges))
+            self.storage.remove_edges(lows, highs)
+            self._removed(lows, highs)
+            return
+
         num_removed = 0
+        removed = [] if self.listeners else None
         while num_removed < num_edges:
-            random_node = self.decimal_Node_dict[self.rand.randint(0, 2**self.n - 1)]
-            neighbors = self.nodes_adjacency[random_node]
+            random_node = self.rand.randint(0, 2**self.n - 1)
+            neighbors = self.storage.neighbors(random_node)
             if neighbors:
                 node_to_remove = neighbors[self.rand.randint(0, len(neighbors) - 1)]
-                self.nodes_adjacency[random_node].remove(node_to_remove)
-                self.nodes_adjacency[node_to_remove].remove(random_node)
+                self.storage.remove_edge(random_node, node_to_remove)
                 num_removed += 1
+                if removed is not None:
+                    removed.append((random_node, node_to_remove))
+        if removed:
+            self._removed(*(np.array(ends, dtype=np.uint64) for ends in zip(*removed)))
+
+    def _sample_edges(self, k):
+        """k distinct present edges chosen uniformly, as (lows, highs) arrays."""
+        if 2**self.n <= FIELD_LIMIT: # enumerate the present edges and choose among them
+            lows, highs = Bits.edge_list(self.edge_masks(), self.n)
+            chosen = self._generator().choice(len(lows), size=k, replace=False)
+            return lows[chosen], highs[chosen]
+        # cube too large to enumerate: draw (dim, rest of the bits) uniformly from the n2^(n-1) edge ids, reject repeats
+        lows, seen = [], set()
+        while len(lows) < k:
+            dims = self._generator().integers(0, self.n, size=k - len(lows)).tolist()
+            rests = self._generator().integers(0, 2**(self.n - 1), size=k - len(lows), dtype=np.uint64).tolist()
+            for dim, rest in zip(dims, rests):
+                low = ((rest >> dim) << (dim + 1)) | (rest & ((1 << dim) - 1)) # insert a 0 at bit dim
+                key = (low, dim)
+                if key not in seen and self.storage.has_edge(low, low ^ (1 << dim)):
+                    seen.add(key)
+                    lows.append(key)
+        highs = np.array([low ^ (1 << dim) for low, dim in lows], dtype=np.uint64)
+        return np.array([low for low, _ in lows], dtype=np.uint64), highs
+
+    def percolate(self, p):
+        """
+        Bond percolation: keeps each present edge independently with probability p and removes the rest, in one
+        vectorized O(E) pass seeded like Graph(n, seed).
+        """
+        lows, highs = Bits.edge_list(self._materialized_masks(), self.n)
+        self._mutate()
+        removed = self._generator().random(len(lows)) >= p
+        self.storage.remove_edges(lows[removed], highs[removed])
+        self._removed(lows[removed], highs[removed])
+
+    def site_faults(self, q):
+        """
+        Site faults: each vertex fails independently with probability q and loses all of its edges, in one vectorized
+        O(E) pass seeded like Graph(n, seed). Returns the failed vertices.
+        """
+        lows, highs = Bits.edge_list(self._materialized_masks(), self.n)
+        self._mutate()
+        failed = self._generator().random(2**self.n) < q
+        removed = failed[lows] | failed[highs]
+        self.storage.remove_edges(lows[removed], highs[removed])
+        self._removed(lows[removed], highs[removed])
+        return np.flatnonzero(failed)
 
-    def shortest_path(self, start_bitstr, target_bitstr):
-        """A* algorithm. Heuristic := hamming distance from current_bitstr to target_bitstr. Any path from
-        current to target is greater than or equal in length to the hamming distance. Thus, the heuristic is admissible.
-        The heuristic is also consistent by the property that to get to a 'further' target, more bits must be flipped, and
-        thus the hamming distance between an intermediate node and the target will never be less than that of a closer node."""
-        
-        s_d = c_d = int(start_bitstr, 2) # decimal value of start bitstring
-        fringe = Fringe(self.decimal_Node_dict.keys()) # Fringe PQ [decimal_key : distance]
-        distTo = {v : float('inf') for v in self.decimal_Node_dict.keys()} # initialize distances to each node as infinity
-        fringe.remove(s_d) # remove start node from fringe
-        distTo[s_d] = 0 # set distance to start node = 0
-        edgeTo = {v: None for v in self.nodes_adjacency.keys()}
+    def _materialized_masks(self):
+        if 2**self.n > FIELD_LIMIT:
+            raise ValueError(f'a {self.n} dimensional cube is too large to sweep every edge')
+        return self.edge_masks()
+
+    def shortest_path(self, start_bitstr, target_bitstr, bidirectional=False, stats=False, ida=False, table_size=IDA_TABLE_SIZE,
+                      max_bound=None):
+        """A* algorithm. Heuristic := hamming distance from current_bitstr to target_bitstr, popcount(current ^ target).
+        Any path from current to target must flip every differing bit at least once, so it is at least as long as the
+        hamming distance. Thus, the heuristic is admissible. It is also consistent: crossing an edge flips exactly one bit,
+        which changes the hamming distance to the target by exactly 1 (the edge length).
+        Once landmarks() are built, A* also uses their tighter lower bounds (bidirectional and ida stick to Hamming).
+        bidirectional=True searches from both ends at once. ida=True runs iterative-deepening A* instead, whose memory is
+        linear in the path length plus a transposition table of at most table_size vertices, for cubes too large to
+        hold A*'s distTo/edgeTo. IDA* proves a target unreachable once a pass enters no vertex the one before it did not,
+        which it can only tell while the table holds every vertex it entered; max_bound gives up (no path) once the
+        bound passes it, for components too large for the table. The number of expanded nodes is left in self.nodes_expanded.
+        Returns a PathResult, whose str() is 'edges: N, path: [...]' or 'No path found.'.
+        stats=True (or a SearchStats) returns (result, SearchStats) instead, see Stats.SearchStats."""
+
+        if bidirectional and ida:
+            raise ValueError('bidirectional and ida are separate modes, pick one')
+        stats = SearchStats() if stats is True else stats or None
+        s_d = int(start_bitstr, 2) # decimal value of start bitstring
+        t_d = int(target_bitstr, 2)
+        if stats is not None:
+            stats.start()
+        if self._unreachable(s_d, t_d):
+            self.nodes_expanded = 0
+            path = None
+            if stats is not None:
+                stats.searched()
+        elif ida:
+            path = self._ida_star(s_d, t_d, table_size, max_bound, stats)
+        else:
+            path = self._bidirectional_astar(s_d, t_d, stats) if bidirectional else self._astar(s_d, t_d, stats)
+        result = PathResult(s_d, t_d, path, self.n)
+        if stats is None:
+            return result
+        stats.reconstructed()
+        return result, stats
+
+    def _astar(self, s_d, t_d, stats=None):
+        """
+        Returns the vertices on a shortest path from s_d to t_d as an array, or None.
+        With landmarks, vertices are queued under the Hamming bound and only get the (costlier) landmark bound when
+        they reach the front of the fringe: if it is larger they go back in under it, so each vertex pays for one
+        landmark lookup however often it is relaxed, and the order of expansions is that of A* with the landmark bound.
+        Vertices a landmark proves cut off from t_d are dropped.
+        """
+        INF = float('inf')
+        h = None if self.landmark_index is None else self.landmark_index.bound(t_d)
+        bounded = {} # vertex : its landmark bound, once looked up
+        fringe = BucketFringe() # integer priorities, vertices are inserted lazily when first reached
+        fringe.push(s_d, (s_d ^ t_d).bit_count())
+        distTo = {s_d : 0} # distances to reached nodes, every other node is implicitly at infinity
+        edgeTo = {}
         EDGE_LENGTH = 1 # all edges are a hamming distance of 1 in a hypercube
+        neighbors, push = self.storage.neighbors, fringe.push
+        if stats is not None:
+            neighbors, push = stats.counted_neighbors(neighbors), stats.counted_push(fringe, distTo)
+        self.nodes_expanded = 0
         while fringe:
-            c_node = self.decimal_Node_dict[c_d] 
+            # dequeue shortest distance vertex
+            c_d = fringe.pop()
+            if h is not None and c_d not in bounded:
+                h_c = bounded[c_d] = h(c_d)
+                if h_c == INF: # a landmark proves t_d unreachable from c_d
+                    continue
+                if h_c > (c_d ^ t_d).bit_count(): # queued too early, requeue under the tighter bound
+                    fringe.push(c_d, distTo[c_d] + h_c)
+                    continue
+            self.nodes_expanded += 1
+            if c_d == t_d:
+                break
+            g = distTo[c_d] # distance to current node
             # relax neighbors
-            for neighbor in self.nodes_adjacency[c_node]: 
-                g = distTo[c_d] # distance to current node
-                h = c_node.hamming_distance(neighbor) # estimated distance from current node to target
-                n_d = neighbor.value
-                if g + EDGE_LENGTH + h < distTo[n_d]:
-                    fringe.push(n_d, g + EDGE_LENGTH + h)
+            for n_d in neighbors(c_d):
+                if g + EDGE_LENGTH < distTo.get(n_d, INF):
+                    h_n = (n_d ^ t_d).bit_count() if h is None else bounded.get(n_d, (n_d ^ t_d).bit_count())
+                    if h_n == INF:
+                        continue
                     distTo[n_d] = g + EDGE_LENGTH
-                    edgeTo[neighbor] = c_node
-            # dequeue shortest distance vertex
-            c_d = fringe.pop().vertex
-            if c_d == int(target_bitstr, 2):
+                    edgeTo[n_d] = c_d
+                    push(n_d, g + EDGE_LENGTH + h_n) # f = g + h
+        if stats is not None:
+            stats.searched()
+        if t_d not in distTo: # the fringe ran dry without reaching the target
+            return None
+        return trace(edgeTo, s_d, t_d, distTo[t_d] + 1, Bits.mask_dtype(self.n)) # gather path from edgeTo
+
+    def _bidirectional_astar(self, s_d, t_d, stats=None):
+        """
+        Bidirectional A* with the balanced potential p(v) = (h_t(v) - h_s(v)) / 2 forward and -p(v) backward, which
+        keeps both searches consistent. Keys are doubled (and shifted by C = popcount(s ^ t)) to stay integers for the
+        bucket queues. The frontiers stop once no path through them can beat the best meeting point found so far,
+        i.e. when the two smallest keys sum to at least 2 * (best + C).
+        """
+        C = (s_d ^ t_d).bit_count()
+        fringes = (BucketFringe(), BucketFringe())
+        distTo = ({s_d : 0}, {t_d : 0}) # forward from s_d, backward from t_d
+        edgeTo = ({}, {})
+        goals = (t_d, s_d)
+        fringes[0].push(s_d, 2 * C)
+        fringes[1].push(t_d, 2 * C)
+        best, meet = float('inf'), None
+        INF = float('inf')
+        neighbors, pushes = self.storage.neighbors, (fringes[0].push, fringes[1].push)
+        if stats is not None:
+            neighbors = stats.counted_neighbors(neighbors)
+            pushes = tuple(stats.counted_push(fringe, dist) for fringe, dist in zip(fringes, distTo))
+        self.nodes_expanded = 0
+        if s_d == t_d:
+            best, meet = 0, s_d
+        while fringes[0] and fringes[1]:
+            if fringes[0].min_priority() + fringes[1].min_priority() >= 2 * (best + C):
                 break
-        target_node = self.decimal_Node_dict[int(target_bitstr, 2)]
-        if not edgeTo[target_node]:
-            return "No path found."
-        # Gather path from edgeTo list
-        start_node = self.decimal_Node_dict[s_d]
-        path = [target_node]
-        while target_node != start_node:
-            path = [edgeTo[target_node]] + path
-            target_node = edgeTo[target_node]
-        return f'edges: {len(path)-1}, path: {path}'
+            side = 0 if len(fringes[0]) <= len(fringes[1]) else 1 # grow the smaller frontier
+            fringe, push, dist, edges, other = fringes[side], pushes[side], distTo[side], edgeTo[side], distTo[1 - side]
+            goal, origin = goals[side], goals[1 - side]
+            c_d = fringe.pop()
+            self.nodes_expanded += 1
+            g = dist[c_d]
+            for n_d in neighbors(c_d):
+                if g + 1 < dist.get(n_d, INF):
+                    dist[n_d] = g + 1
+                    edges[n_d] = c_d
+                    push(n_d, 2 * (g + 1) + (n_d ^ goal).bit_count() - (n_d ^ origin).bit_count() + C)
+                if n_d in other and g + 1 + other[n_d] < best: # frontiers touch
+                    best, meet = g + 1 + other[n_d], n_d
+        if stats is not None:
+            stats.searched()
+        if meet is None:
+            return None
+        # Gather path: forward half from edgeTo[0], backward half from edgeTo[1]
+        dtype = Bits.mask_dtype(self.n)
+        forward = trace(edgeTo[0], s_d, meet, distTo[0][meet] + 1, dtype)
+        backward = trace(edgeTo[1], t_d, meet, distTo[1][meet] + 1, dtype)[::-1]
+        return np.concatenate((forward, backward[1:]))
+
+    def _ida_star(self, s_d, t_d, table_size, max_bound=None, stats=None):
+        """
+        Iterative-deepening A*: depth first searches that cut off at f = g + popcount(v ^ t) > bound, raising the bound
+        to the smallest f that was cut off until the target is reached. The first bound that reaches it is the
+        shortest distance, since h is admissible. Only the current path and its unexplored neighbors are kept, plus a
+        transposition table holding the smallest g each vertex was entered at under the current bound (at most
+        table_size vertices, least recently used evicted): reentering a vertex at no smaller g cannot find anything
+        new. Neighbors that flip a bit toward the target are tried first. Returns the path as an array, or None.
+        A pass under bound B enters exactly the vertices v with d(s, v) + h(v) <= B, and since h is consistent that sum
+        grows by 0 or 2 along a shortest path, so if any vertex (the target included) lies beyond B, one lies at B + 2.
+        A pass that enters no more vertices than the one before therefore proves the target unreachable. Counting the
+        vertices entered needs a table that evicted none of them; otherwise only max_bound ends the search.
+        """
+        get_neighbors = self.storage.neighbors if stats is None else stats.counted_neighbors(self.storage.neighbors)
+
+        def toward(c_d): # neighbors of c_d, the ones closer to t_d first
+            neighbors, diff = get_neighbors(c_d), c_d ^ t_d
+            self.nodes_expanded += 1
+            return iter([v for v in neighbors if (v ^ c_d) & diff] + [v for v in neighbors if not (v ^ c_d) & diff])
+
+        self.nodes_expanded = 0
+        INF = float('inf')
+        bound = (s_d ^ t_d).bit_count()
+        found = s_d == t_d
+        entered = None # vertices entered by the last pass, when its table held every one of them
+        while not found and bound < INF and (max_bound is None or bound <= max_bound):
+            table = OrderedDict() # vertex : smallest g it was entered at under this bound
+            evicted = False
+            path, on_path, stack = [s_d], {s_d}, [toward(s_d)]
+            next_bound = INF
+            while stack:
+                n_d = next(stack[-1], None)
+                if n_d is None: # every neighbor tried, back up
+                    stack.pop()
+                    on_path.remove(path.pop())
+                    continue
+                if n_d in on_path:
+                    continue
+                g = len(path)
+                f = g + (n_d ^ t_d).bit_count()
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+                if n_d == t_d:
+                    path.append(n_d)
+                    found = True
+                    break
+                if table_size:
+                    if table.get(n_d, INF) <= g:
+                        table.move_to_end(n_d)
+                        continue
+                    table[n_d] = g
+                    table.move_to_end(n_d)
+                    if len(table) > table_size:
+                        table.popitem(last=False)
+                        evicted = True
+                path.append(n_d)
+                on_path.add(n_d)
+                stack.append(toward(n_d))
+            if not found:
+                if table_size and not evicted and len(table) == entered: # nothing new within reach: no path
+                    break
+                entered = len(table) if table_size and not evicted else None
+            bound = next_bound
+        if stats is not None:
+            stats.searched()
+        if not found:
+            return None
+        return np.array([s_d] if s_d == t_d else path, Bits.mask_dtype(self.n))
+
+    def shortest_paths(self, pairs):
+        """
+        Answers many (start, target) queries at once. Pairs may be bitstrings or vertex values. Queries are grouped by
+        start, and each start either runs A* per target or answers all of its targets from one bitset BFS distance
+        field (with the edge bitsets built once per batch and shared by every start), whichever is estimated cheaper.
+        A* expands at least popcount(s ^ t) + 1 vertices; the batch tracks how many times that it actually expands, and
+        a field is only swept when the expansions it would save on this start's targets outweigh its cost (see
+        FIELD_RATIO). Cubes larger than FIELD_LIMIT always run A*.
+        Returns a list of PathResult in input order.
+        """
+        queries = [(self._vertex(start), self._vertex(target)) for start, target in pairs]
+        by_start = {}
+        for i, (s_d, t_d) in enumerate(queries):
+            by_start.setdefault(s_d, []).append(i)
+        masks = edges = None
+        field_cost = 2**self.n / FIELD_RATIO + FIELD_RATIO if 2**self.n <= FIELD_LIMIT else None
+        expanded = least = 0 # A* expansions so far in this batch, and the lower bound popcount(s ^ t) + 1 summed over them
+        results = [None] * len(queries)
+        for s_d, indices in by_start.items():
+            targets = {queries[i][1] for i in indices if not self._unreachable(s_d, queries[i][1])}
+            lower = sum((s_d ^ t_d).bit_count() + 1 for t_d in targets)
+            excess = expanded / least if least else 1.0 # expansions per unit of lower bound, 1.0 until A* has run
+            if field_cost is not None and (excess - 1) * lower > field_cost:
+                if edges is None:
+                    masks = self.edge_masks()
+                    edges = Bits.edge_bitsets(masks, self.n)
+                paths = self._field_paths(distance_field(masks, self.n, s_d, edges), s_d, targets)
+            else:
+                paths = {}
+                for t_d in targets:
+                    paths[t_d] = self._astar(s_d, t_d)
+                    expanded += self.nodes_expanded
+                least += lower
+            for i in indices:
+                results[i] = PathResult(s_d, queries[i][1], paths.get(queries[i][1]), self.n)
+        return results
+
+    def _vertex(self, v):
+        return v if isinstance(v, int) else int(v, 2)
+
+    def _field_paths(self, dist, s_d, targets):
+        """Walks each reachable target back to s_d through neighbors one step closer. Returns {target : path}."""
+        unreached = np.iinfo(dist.dtype).max
+        dtype = Bits.mask_dtype(self.n)
+        paths = {}
+        for t_d in targets:
+            d = dist.item(t_d)
+            if d != unreached:
+                paths[t_d] = np.fromiter(self._descend(dist, t_d, d), dtype, count=d + 1)[::-1]
+        return paths
+
+    def _descend(self, dist, v, d):
+        yield v
+        while d:
+            d -= 1
+            v = next(u for u in self.storage.neighbors(v) if dist.item(u) == d)
+            yield v
 
     def __repr__(self):
         out = []
-        for node in self.nodes_adjacency.keys():
-            out.append(f'{node.bitstr}: {", ".join([neighbor.bitstr for neighbor in self.nodes_adjacency[node]])}')
+        for v in self.storage.vertices():
+            out.append(f'{self.bitstr(v)}: {", ".join([self.bitstr(neighbor) for neighbor in self.storage.neighbors(v)])}')
         return '\n'.join(out)
@@ -0,0 +1,142 @@
+import os
+import struct
+import numpy as np
+from Bits import mask_dtype
+
+# Binary subgraph format, version 1. A 64 byte header followed by one little-endian edge mask per vertex,
+# in vertex order, each mask_dtype(n) wide. The body starts 64-byte aligned so it can be memory-mapped as is.
+MAGIC = b'HCSG'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBqQ') # magic, version, mask width in bytes, n, seed, edge count
+HEADER_SIZE = 64
+CHUNK = 2**20 # masks or edge records per chunk
+TEXT_CHUNK = 2**12 # lines per chunk
+
+def write_masks(path, masks, n, seed, edge_count):
+    """
+    Writes a version 1 file. masks may be any array of per-vertex edge masks, including a memmap of path itself:
+    the file is written next to path under a temporary name and renamed over it once complete.
+    """
+    dtype = mask_dtype(n).newbyteorder('<')
+    tmp = f'{os.fspath(path)}.{os.getpid()}.tmp' # same directory, so the rename stays on one filesystem
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, dtype.itemsize, n, seed, edge_count).ljust(HEADER_SIZE, b'\0'))
+            for start in range(0, 2**n, CHUNK):
+                f.write(np.ascontiguousarray(masks[start:start + CHUNK], dtype=dtype).tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def read_header(path):
+    """Returns (n, seed, edge count, mask dtype) after checking the magic and version."""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or raw[:4] != MAGIC:
+        raise ValueError(f'{path} is not a hypercube subgraph file')
+    magic, version, width, n, seed, edge_count = HEADER.unpack_from(raw)
+    if version != VERSION:
+        raise ValueError(f'{path} has format version {version}, expected {VERSION}')
+    dtype = mask_dtype(n).newbyteorder('<')
+    if width != dtype.itemsize:
+        raise ValueError(f'{path} stores {width} byte masks, expected {dtype.itemsize} for n = {n}')
+    return n, seed, edge_count, dtype
+
+def open_masks(path, mode='r'):
+    """
+    Maps the masks of a version 1 file with numpy.memmap, so nothing is read until it is touched. mode is the memmap
+    mode: 'r' read-only (safe to share between processes) or 'c' copy-on-write.
+    Returns (n, seed, edge count, masks).
+    """
+    n, seed, edge_count, dtype = read_header(path)
+    masks = np.memmap(path, dtype=dtype, mode=mode, offset=HEADER_SIZE, shape=(2**n,))
+    return n, seed, edge_count, masks
+
+# Streaming adjacency export. 'text' is the `bitstr: nbr, nbr` layout of Graph.__repr__, one line per vertex.
+# 'binary' is an edge list: a 64 byte header like the mask format (magic HCEL) followed by one record per edge,
+# the endpoint with the flipped bit clear (mask width, little-endian) and the flipped dimension (one byte).
+EDGE_MAGIC = b'HCEL'
+
+def edge_record(n):
+    return np.dtype([('low', mask_dtype(n).newbyteorder('<')), ('dim', 'u1')])
+
+def mask_chunks(storage, n, chunk=CHUNK):
+    """Yields (first vertex, edge masks) for consecutive blocks of vertices without materializing the whole cube."""
+    masks = getattr(storage, 'masks', None)
+    for start in range(0, 2**n, chunk):
+        stop = min(start + chunk, 2**n)
+        if masks is not None:
+            yield start, np.asarray(masks[start:stop])
+        else:
+            yield start, np.array([sum(v ^ u for u in storage.neighbors(v)) for v in range(start, stop)], dtype=mask_dtype(n))
+
+def write_adjacency(storage, n, seed, f, format='text', chunk=CHUNK):
+    """Streams the adjacency of storage to f (a path or a file object opened in the matching text/binary mode)."""
+    if isinstance(f, (str, os.PathLike)):
+        with open(os.fspath(f), 'w' if format == 'text' else 'wb') as file:
+            return write_adjacency(storage, n, seed, file, format, chunk)
+    if format == 'text':
+        lines = []
+        for v in storage.vertices():
+            lines.append(f'{v:0{n}b}: {", ".join(f"{u:0{n}b}" for u in storage.neighbors(v))}')
+            if len(lines) == TEXT_CHUNK:
+                f.write('\n'.join(lines) + '\n')
+                lines = []
+        f.write('\n'.join(lines) + ('\n' if lines else ''))
+    elif format == 'binary':
+        f.write(HEADER.pack(EDGE_MAGIC, VERSION, mask_dtype(n).itemsize, n, seed, storage.num_edges()).ljust(HEADER_SIZE, b'\0'))
+        record = edge_record(n)
+        for start, masks in mask_chunks(storage, n, chunk):
+            vertices = np.arange(start, start + len(masks), dtype=np.uint64)
+            for dim in range(n):
+                has = ((masks >> masks.dtype.type(dim)) & 1 == 1) & (vertices >> np.uint64(dim) & np.uint64(1) == 0)
+                records = np.empty(int(has.sum()), dtype=record)
+                records['low'], records['dim'] = vertices[has], dim
+                f.write(records.tobytes())
+    else:
+        raise ValueError(f"format must be 'text' or 'binary', not {format!r}")
+
+def read_adjacency(f, format='text', chunk=CHUNK):
+    """
+    Reads a stream written by write_adjacency (or Graph.__repr__ output for 'text') chunk by chunk.
+    Returns (n, seed, edge masks); text streams carry no seed, so it is None.
+    """
+    if isinstance(f, (str, os.PathLike)):
+        with open(os.fspath(f), 'r' if format == 'text' else 'rb') as file:
+            return read_adjacency(file, format, chunk)
+    if format == 'text':
+        masks, n = None, None
+        for line in f:
+            vertex, _, neighbors = line.rstrip('\n').partition(': ')
+            if not vertex:
+                continue
+            if masks is None:
+                n = len(vertex)
+                masks = np.zeros(2**n, dtype=mask_dtype(n))
+            v = int(vertex, 2)
+            masks[v] = sum(v ^ int(u, 2) for u in neighbors.split(', ') if u)
+        if masks is None:
+            raise ValueError('empty adjacency stream')
+        return n, None, masks
+    if format == 'binary':
+        raw = f.read(HEADER_SIZE)
+        if len(raw) < HEADER_SIZE or raw[:4] != EDGE_MAGIC:
+            raise ValueError('not a hypercube edge list stream')
+        magic, version, width, n, seed, edge_count = HEADER.unpack_from(raw)
+        if version != VERSION:
+            raise ValueError(f'edge list has format version {version}, expected {VERSION}')
+        record = edge_record(n)
+        masks = np.zeros(2**n, dtype=mask_dtype(n))
+        while True:
+            block = f.read(chunk * record.itemsize)
+            if not block:
+                break
+            records = np.frombuffer(block, dtype=record)
+            for dim in range(n): # each low appears at most once per dimension
+                lows = records['low'][records['dim'] == dim].astype(np.uint64)
+                masks[lows] |= masks.dtype.type(1 << dim)
+                masks[lows | np.uint64(1 << dim)] |= masks.dtype.type(1 << dim)
+        return n, seed, masks
+    raise ValueError(f"format must be 'text' or 'binary', not {format!r}")
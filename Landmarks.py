@@ -0,0 +1,92 @@
+import time
+import numpy as np
+import Bits
+from BFS import distance_field
+from Components import label_components
+
+INF = float('inf')
+METHODS = ('farthest', 'antipodal')
+
+class Landmarks:
+    """
+    ALT (A*, landmarks, triangle inequality) lower bounds. For a landmark L, |d(L, t) - d(L, v)| <= d(v, t), so
+    max(popcount(v ^ t), that bound over every landmark) is still admissible and consistent, and far tighter than
+    Hamming distance alone once heavy damage forces long detours. distances[v] holds v's BFS distance to each
+    landmark (uint8 while they fit, the dtype's maximum when unreachable), one row per vertex.
+    Removing edges only makes distances longer, so landmarks built on an earlier version stay admissible, just
+    looser; version records which one they were built on.
+    method 'farthest' picks each landmark as far as possible from the ones before it (one BFS each, the first
+    from a random vertex of the largest component), 'antipodal' picks random vertices paired with their complements.
+    """
+
+    def __init__(self, masks, n, k, method, rng, version):
+        if method not in METHODS:
+            raise ValueError(f'unknown landmark method {method!r}, expected one of {list(METHODS)}')
+        start = time.perf_counter()
+        self.n = n
+        self.version = version
+        edges = Bits.edge_bitsets(masks, n)
+        full = 2**n - 1
+        if method == 'antipodal':
+            vertices = []
+            while len(vertices) < k:
+                v = int(rng.integers(2**n))
+                vertices += [v, v ^ full][:k - len(vertices)]
+            fields = [distance_field(masks, n, v, edges) for v in vertices]
+        else:
+            labels = label_components(masks, n) # start inside the largest component, where most queries land
+            seed = int(rng.choice(np.flatnonzero(labels == np.bincount(labels).argmax())))
+            nearest = self._finite(distance_field(masks, n, seed, edges)) # distance to the closest landmark so far
+            vertices, fields = [], []
+            while len(vertices) < k:
+                v = int(np.argmax(nearest)) # farthest reachable vertex from the landmarks picked so far
+                field = distance_field(masks, n, v, edges)
+                vertices.append(v)
+                fields.append(field)
+                nearest = np.minimum(nearest, self._finite(field)) if len(vertices) > 1 else self._finite(field)
+        dtype = max((field.dtype for field in fields), key=lambda dtype: dtype.itemsize)
+        self.unreached = int(np.iinfo(dtype).max)
+        self.distances = np.empty((2**n, k), dtype=dtype)
+        for i, field in enumerate(fields):
+            self.distances[:, i] = field
+            self.distances[field == np.iinfo(field.dtype).max, i] = self.unreached
+        self.vertices = vertices
+        self.build_time = time.perf_counter() - start
+
+    @staticmethod
+    def _finite(field):
+        """Distances with unreachable vertices at -1, so argmax never picks them."""
+        return np.where(field == np.iinfo(field.dtype).max, -1, field.astype(np.int64))
+
+    @property
+    def nbytes(self):
+        return self.distances.nbytes
+
+    @property
+    def bytes_per_landmark(self):
+        return self.distances.nbytes // max(len(self.vertices), 1)
+
+    def bound(self, t):
+        """
+        The heuristic toward target t, as a function of v. It returns infinity for a vertex some landmark proves
+        cannot reach t (one of the two is unreachable from that landmark, the other is not).
+        """
+        rows, unreached = self.distances, self.unreached
+        to_t = rows[t].tolist()
+
+        def h(v):
+            best = (v ^ t).bit_count()
+            for a, b in zip(rows[v].tolist(), to_t):
+                if a == unreached or b == unreached:
+                    if a != b:
+                        return INF
+                elif a - b > best:
+                    best = a - b
+                elif b - a > best:
+                    best = b - a
+            return best
+        return h
+
+    def __repr__(self):
+        return (f'Landmarks(k={len(self.vertices)}, version={self.version}, build_time={self.build_time:.3f}s, '
+                f'bytes_per_landmark={self.bytes_per_landmark})')
@@ -1,18 +1,31 @@
 class Node:
+    """
+    A vertex of the n dimensional cube. Only the integer value (and the dimension, for formatting) is stored;
+    bitstr and hamming_weight are derived from value when asked for, so a Node is two slots and no __dict__.
+    Graph.node(v) makes one on demand for any engine.
+    """
+    __slots__ = ('value', 'dim')
 
     def __init__(self, value: int, dim: int):
         self.value = value
-        self.bitstr = str(format(self.value, f'0{dim}b'))
-        self.hamming_weight = sum([eval(e) for e in self.bitstr])
+        self.dim = dim
+
+    @property
+    def bitstr(self):
+        return format(self.value, f'0{self.dim}b')
+
+    @property
+    def hamming_weight(self):
+        return self.value.bit_count()
 
     def __repr__(self):
-        return f'{self.bitstr}'
+        return self.bitstr
 
     def __eq__(self, other_node):
         return self.value == other_node.value
-        
+
     def __hash__(self):
         return self.value
-    
+
     def hamming_distance(self, other):
-        return abs(self.hamming_weight - other.hamming_weight)
\ No newline at end of file
+        return (self.value ^ other.value).bit_count() # number of differing bits
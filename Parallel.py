@@ -0,0 +1,75 @@
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from Graph import Graph
+from Storage import MaskStorage
+
+_worker_graph = None # per worker process: a Graph over the shared masks
+_worker_shm = None # keeps the shared memory attached while the worker lives
+
+def _attach(name, dtype, n, seed):
+    global _worker_graph, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=name) # the pool shares the parent's resource tracker, the parent unlinks
+    masks = np.ndarray(2**n, dtype=dtype, buffer=_worker_shm.buf)
+    _worker_graph = Graph(n, seed, 'mask', MaskStorage(n, masks))
+
+def _shortest_paths(pairs):
+    return _worker_graph.shortest_paths(pairs)
+
+def _paths(pairs):
+    return [_worker_graph.path(start, end) for start, end in pairs]
+
+class ParallelExecutor:
+    """
+    Runs shortest_path/path query batches on a process pool. The graph's edge masks are copied once into
+    multiprocessing.shared_memory and every worker maps them read-only, so nothing but the query pairs and
+    results is pickled. Changes to the graph after the executor is created are not seen by the workers.
+    Example:
+    with ParallelExecutor(g) as executor:
+        results = executor.shortest_paths(pairs)
+    """
+
+    def __init__(self, graph, processes=None, chunksize=256):
+        masks = graph.edge_masks()
+        self.n = graph.n
+        self.chunksize = chunksize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(masks.nbytes, 1))
+        np.ndarray(masks.shape, dtype=masks.dtype, buffer=self.shm.buf)[:] = masks
+        self.pool = multiprocessing.Pool(processes, initializer=_attach,
+                                         initargs=(self.shm.name, masks.dtype.str, graph.n, graph.seed))
+
+    def shortest_paths(self, pairs):
+        """Same as Graph.shortest_paths, fanned out over the pool. Returns PathResults in input order."""
+        return self._map(_shortest_paths, pairs)
+
+    def paths(self, pairs):
+        """Graph.path for every (start, end) pair, in input order."""
+        return self._map(_paths, pairs)
+
+    def _map(self, function, pairs):
+        """
+        Sorts the queries by start so that chunks keep a start's targets together (and Graph.shortest_paths can share
+        its search), runs the chunks on the pool and puts the results back in input order.
+        """
+        pairs = list(pairs)
+        order = sorted(range(len(pairs)), key=lambda i: str(pairs[i][0]))
+        chunks = [[pairs[i] for i in order[k:k + self.chunksize]] for k in range(0, len(order), self.chunksize)]
+        results = [None] * len(pairs)
+        position = 0
+        for chunk_results in self.pool.imap(function, chunks):
+            for result in chunk_results:
+                results[order[position]] = result
+                position += 1
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from PathResult import PathResult
+
+ENTRY_BYTES = 200 # rough cost of one cached result besides its vertex array: key, OrderedDict slot, PathResult
+INDEX_BYTES = 100 # rough cost of indexing one vertex of a cached path (its dict slot in where)
+
+class PathCache:
+    """
+    LRU cache of Graph.shortest_path results for workloads that repeat queries between rare edge changes.
+    Entries are bounded by count (max_entries) and by estimated memory (max_bytes); the least recently used
+    go first. Any change to the graph (its version moves on) drops the whole cache on the next query.
+    Subpaths of shortest paths are shortest paths, so a query whose endpoints both lie on a cached path, in either
+    order, is answered by slicing it. Counters: hits, subpath_hits, misses, evictions, invalidations.
+    Example:
+    cache = PathCache(g)
+    cache.shortest_path('0000', '1111')
+    """
+
+    def __init__(self, graph, max_entries=4096, max_bytes=64 * 2**20):
+        self.graph = graph
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # (start, target) : PathResult, least recently used first
+        self.where = {} # vertex : {(start, target) : position of vertex on that cached path}
+        self.bytes = 0
+        self.version = graph.version
+        self.hits = self.subpath_hits = self.misses = self.evictions = self.invalidations = 0
+
+    def shortest_path(self, start, target, **options):
+        """
+        Same as graph.shortest_path(start, target, **options), served from the cache when possible. start and
+        target may be bitstrings or vertex values. options (bidirectional, ida, ...) only matter on a miss; stats is
+        refused, since hits run no search to measure. A search with max_bound that finds no path is not cached.
+        """
+        if options.get('stats'):
+            raise ValueError('PathCache does not collect stats, call graph.shortest_path directly')
+        if self.graph.version != self.version:
+            self.clear()
+            self.invalidations += 1
+            self.version = self.graph.version
+        s_d, t_d = self.graph._vertex(start), self.graph._vertex(target)
+        result = self.entries.get((s_d, t_d))
+        if result is not None:
+            self.entries.move_to_end((s_d, t_d))
+            self.hits += 1
+            return result
+        result = self._subpath(s_d, t_d)
+        if result is not None:
+            self.subpath_hits += 1
+            return result
+        self.misses += 1
+        result = self.graph.shortest_path(self.graph.bitstr(s_d), self.graph.bitstr(t_d), **options)
+        if result.found or options.get('max_bound') is None: # a bounded IDA* miss may just have given up
+            self._insert((s_d, t_d), result)
+        return result
+
+    def _subpath(self, s_d, t_d):
+        on_s, on_t = self.where.get(s_d), self.where.get(t_d)
+        if not on_s or not on_t:
+            return None
+        if len(on_t) < len(on_s):
+            on_s, on_t = on_t, on_s # only which paths hold both matters, scan the shorter index
+        for key in on_s:
+            if key in on_t:
+                i, j = self.where[s_d][key], self.where[t_d][key]
+                self.entries.move_to_end(key)
+                vertices = self.entries[key].vertices
+                return PathResult(s_d, t_d, vertices[i:j + 1] if i <= j else vertices[j:i + 1][::-1], self.graph.n)
+        return None
+
+    def _insert(self, key, result):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = result
+        self.bytes += self._size(result)
+        if result.vertices is not None:
+            for position, v in enumerate(result.vertices.tolist()):
+                self.where.setdefault(v, {})[key] = position
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        result = self.entries.pop(key)
+        self.bytes -= self._size(result)
+        if result.vertices is not None:
+            for v in result.vertices.tolist():
+                on_v = self.where[v]
+                del on_v[key]
+                if not on_v:
+                    del self.where[v]
+
+    def _size(self, result):
+        if result.vertices is None:
+            return ENTRY_BYTES
+        return ENTRY_BYTES + result.vertices.nbytes + INDEX_BYTES * len(result.vertices)
+
+    def clear(self):
+        self.entries.clear()
+        self.where.clear()
+        self.bytes = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of queries answered without a search, exact or subpath."""
+        queries = self.hits + self.subpath_hits + self.misses
+        return (self.hits + self.subpath_hits) / queries if queries else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (f'PathCache(entries={len(self.entries)}, bytes={self.bytes}, hits={self.hits}, '
+                f'subpath_hits={self.subpath_hits}, misses={self.misses}, evictions={self.evictions}, '
+                f'invalidations={self.invalidations})')
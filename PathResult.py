@@ -0,0 +1,69 @@
+import numpy as np
+from Bits import mask_dtype
+
+def trace(edgeTo, start, end, length, dtype):
+    """
+    The path from start to end as an array of length vertices, following edgeTo back from end. One allocation,
+    O(length), no list prepends.
+    """
+    def back(v):
+        yield v
+        while v != start:
+            v = edgeTo[v]
+            yield v
+    return np.fromiter(back(end), dtype, count=length)[::-1]
+
+class PathResult:
+    """
+    Outcome of one (start, target) query. vertices holds the path as an integer array from start to target,
+    or None when the target is unreachable. Iterating yields the vertex values lazily; bitstrings are only
+    formatted when asked for (bitstrs(), str()), and str() matches the strings shortest_path used to return.
+    """
+    __slots__ = ('start', 'target', 'vertices', 'n')
+    MISSING = 'No path found.'
+
+    def __init__(self, start, target, vertices, n):
+        self.start = start
+        self.target = target
+        self.vertices = vertices if vertices is None or isinstance(vertices, np.ndarray) else np.array(vertices, mask_dtype(n))
+        self.n = n
+
+    @property
+    def found(self):
+        return self.vertices is not None
+
+    @property
+    def edges(self):
+        return len(self.vertices) - 1 if self.vertices is not None else None
+
+    def __len__(self):
+        return len(self.vertices) if self.vertices is not None else 0
+
+    def __bool__(self):
+        return self.vertices is not None
+
+    def __iter__(self):
+        if self.vertices is not None:
+            for v in self.vertices:
+                yield int(v)
+
+    def bitstr(self, i):
+        return format(int(self.vertices[i]), f'0{self.n}b')
+
+    def bitstrs(self):
+        return [format(v, f'0{self.n}b') for v in self.vertices.tolist()] if self.vertices is not None else None
+
+    def __repr__(self):
+        if self.vertices is None:
+            return self.MISSING
+        return f'edges: {self.edges}, path: [{", ".join(self.bitstrs())}]'
+
+class WalkResult(PathResult):
+    """A path found by Graph.path: valid but not necessarily shortest. str() matches what path used to return."""
+    __slots__ = ()
+    MISSING = 'no path'
+
+    def __repr__(self):
+        if self.vertices is None:
+            return self.MISSING
+        return f'edges: {self.edges}, path: {self.bitstrs()}'
@@ -0,0 +1,133 @@
+import heapq
+import numpy as np
+from Bits import mask_dtype
+from PathResult import PathResult
+
+INF = float('inf')
+
+class Planner:
+    """
+    Lifelong Planning A* (LPA*) between a fixed start and target of a Graph that keeps losing edges.
+    g[v] is the distance found for v, rhs[v] the one-step lookahead min(g[u] + 1) over v's neighbors u. The first
+    plan() is an A* search; afterwards the planner listens to the graph, and an edge removal only re-expands the
+    vertices whose distances it changes. The heuristic popcount(v ^ target) stays admissible as edges disappear.
+    Graph edges are only ever removed, which is all LPA* needs to be told about. close() detaches from the graph.
+    Example:
+    planner = Planner(g, '0000', '1111')
+    planner.plan()
+    g.subgraph(3)
+    planner.plan() # repaired, self.nodes_expanded counts the re-expanded vertices
+    """
+
+    def __init__(self, graph, start, target):
+        self.graph = graph
+        self.start = graph._vertex(start)
+        self.target = graph._vertex(target)
+        self.g = {} # vertex : distance from start, infinity when absent
+        self.rhs = {self.start : 0} # vertex : lookahead distance, infinity when absent
+        self.keys = {} # queued vertex : its current key
+        self.queue = [] # heap of (key, vertex), entries whose key is no longer in self.keys are skipped
+        self._queue(self.start)
+        self.pending = [] # (u, v) edges removed since the last plan()
+        self.nodes_expanded = 0 # vertices expanded by the last plan()
+        graph.listeners.append(self._removed)
+
+    def _removed(self, lows, highs):
+        g, rhs = self.g, self.rhs # an edge between two vertices the search never reached cannot change any distance
+        self.pending.extend((u, v) for u, v in zip(lows.tolist(), highs.tolist()) if u in g or u in rhs or v in g or v in rhs)
+
+    def _key(self, v):
+        """
+        (f, 0 if underconsistent else 1, -distance). Textbook LPA* breaks f ties toward the smaller distance, which in a
+        cube expands every vertex between start and target (they all share one f). Breaking them toward the larger
+        distance dives like A* does, and putting underconsistent vertices first keeps the termination test sound:
+        every stale vertex a path to the target could lean on has f <= g[target] and is fixed before plan() stops.
+        """
+        g, rhs = self.g.get(v, INF), self.rhs.get(v, INF)
+        d = min(g, rhs)
+        return (d + (v ^ self.target).bit_count(), 0 if g < rhs else 1, -d)
+
+    def _queue(self, v):
+        key = self._key(v)
+        self.keys[v] = key
+        heapq.heappush(self.queue, (key, v))
+
+    def _top(self):
+        """Smallest current (key, vertex) in the queue, dropping outdated entries, or an infinite key and None."""
+        while self.queue:
+            key, v = self.queue[0]
+            if self.keys.get(v) == key:
+                return key, v
+            heapq.heappop(self.queue)
+        return (INF, 1, -INF), None
+
+    def _requeue(self, v):
+        """Queues v under its current key iff it is inconsistent."""
+        self.keys.pop(v, None)
+        if self.g.get(v, INF) != self.rhs.get(v, INF):
+            self._queue(v)
+
+    def _update(self, v, neighbors=None):
+        """Recomputes rhs[v] from all of v's current neighbors, for when the one it leaned on got worse."""
+        if v != self.start:
+            g = self.g
+            rhs = min([g.get(u, INF) for u in neighbors or self.graph.storage.neighbors(v)], default=INF) + 1
+            if rhs == INF:
+                self.rhs.pop(v, None)
+            else:
+                self.rhs[v] = rhs
+        self._requeue(v)
+
+    def _leaned_on(self, v, u):
+        """Whether rhs[v] comes from its neighbor u, so that u getting worse can change it."""
+        d = self.g.get(u)
+        return d is not None and self.rhs.get(v) == d + 1
+
+    def plan(self):
+        """Applies the edge removals seen since the last call and repairs the shortest path. Returns a PathResult."""
+        for u, v in self.pending:
+            if self._leaned_on(u, v):
+                self._update(u)
+            if self._leaned_on(v, u):
+                self._update(v)
+        self.pending = []
+        self.nodes_expanded = 0
+        t = self.target
+        while True:
+            key, v = self._top()
+            if not (key < self._key(t) or self.rhs.get(t, INF) != self.g.get(t, INF)) or v is None:
+                break
+            heapq.heappop(self.queue)
+            del self.keys[v]
+            self.nodes_expanded += 1
+            if self.g.get(v, INF) > self.rhs.get(v, INF): # overconsistent: its distance went down, settle it
+                d = self.g[v] = self.rhs[v]
+                for u in self.graph.storage.neighbors(v): # only a decrease, no need to rescan u's neighbors
+                    if d + 1 < self.rhs.get(u, INF) and u != self.start:
+                        self.rhs[u] = d + 1
+                        self._requeue(u)
+            else: # underconsistent: its distance went up, reopen it and everything that leaned on it
+                neighbors = self.graph.storage.neighbors(v)
+                leaners = [u for u in neighbors if self._leaned_on(u, v)]
+                del self.g[v]
+                self._update(v, neighbors)
+                for u in leaners:
+                    self._update(u)
+        return PathResult(self.start, t, self._path(), self.graph.n)
+
+    def _path(self):
+        """Walks back from the target to a neighbor one closer until the start. Returns an array or None."""
+        d = self.g.get(self.target, INF)
+        if d == INF:
+            return None
+
+        def back(v, d):
+            yield v
+            while d:
+                d -= 1
+                v = next(u for u in self.graph.storage.neighbors(v) if self.g.get(u) == d)
+                yield v
+        return np.fromiter(back(self.target, d), mask_dtype(self.graph.n), count=d + 1)[::-1]
+
+    def close(self):
+        self.graph.listeners.remove(self._removed)
@@ -0,0 +1,86 @@
+import time
+
+class SearchStats:
+    """
+    Opt-in instrumentation for one path or shortest_path call. Pass stats=True (or a SearchStats, to install hooks)
+    and the call returns (result, stats). Instrumentation works by wrapping the search's neighbor lookup and fringe
+    push once per call, so when stats is not requested the inner loops run exactly as they would without it.
+
+    Counters:
+    expanded        vertices whose edges were scanned (expanded by A*, or stepped onto by path)
+    scanned         edges looked at from expanded vertices
+    relaxed         edges that improved a tentative distance
+    decrease_keys   relaxations of a vertex already queued, each one a stale FringeTuple under the old heap Fringe
+    backtracks      times path backed up out of a dead end
+    dead_ends       vertices path proved to be dead ends
+    Phase timings, in seconds: search_time (expansion and relaxation) and reconstruct_time (gathering the path).
+
+    Hooks: on_expand(v) is called for every expanded vertex, on_relax(u, v, g) for every relaxed edge u -> v.
+    """
+
+    def __init__(self, on_expand=None, on_relax=None):
+        self.on_expand = on_expand
+        self.on_relax = on_relax
+        self.expanded = 0
+        self.scanned = 0
+        self.relaxed = 0
+        self.decrease_keys = 0
+        self.backtracks = 0
+        self.dead_ends = 0
+        self.search_time = 0.0
+        self.reconstruct_time = 0.0
+        self.clock = 0.0
+        self.current = None # vertex being expanded
+
+    def start(self):
+        self.clock = time.perf_counter()
+
+    def searched(self):
+        """Ends the search phase, starts the reconstruction phase."""
+        now = time.perf_counter()
+        self.search_time += now - self.clock
+        self.clock = now
+
+    def reconstructed(self):
+        self.reconstruct_time += time.perf_counter() - self.clock
+
+    def counted_neighbors(self, neighbors):
+        """Wraps a storage's neighbors(v) to count expansions and scanned edges."""
+        def counted(v):
+            out = neighbors(v)
+            self.current = v
+            self.expanded += 1
+            self.scanned += len(out)
+            if self.on_expand is not None:
+                self.on_expand(v)
+            return out
+        return counted
+
+    def counted_masks(self, edge_mask):
+        """Wraps a storage's edge_mask(v) the same way, for searches that read masks instead of neighbor lists."""
+        def counted(v):
+            mask = edge_mask(v)
+            self.current = v
+            self.expanded += 1
+            self.scanned += mask.bit_count()
+            if self.on_expand is not None:
+                self.on_expand(v)
+            return mask
+        return counted
+
+    def counted_push(self, fringe, distTo):
+        """Wraps fringe.push to count relaxations. distTo must already hold the new distance when push is called."""
+        def counted(v, priority):
+            self.relaxed += 1
+            self.decrease_keys += v in fringe
+            if self.on_relax is not None:
+                self.on_relax(self.current, v, distTo[v])
+            fringe.push(v, priority)
+        return counted
+
+    def as_dict(self):
+        return {name : getattr(self, name) for name in ('expanded', 'scanned', 'relaxed', 'decrease_keys', 'backtracks',
+                                                        'dead_ends', 'search_time', 'reconstruct_time')}
+
+    def __repr__(self):
+        return f'SearchStats({", ".join(f"{name}={value}" for name, value in self.as_dict().items())})'
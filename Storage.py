@@ -0,0 +1,227 @@
+import numpy as np
+from Bits import hypercube_table, mask_dtype, popcount
+from Node import Node
+
+BUILD_BLOCK = 2**12 # table rows turned into Python ints at a time by NodeStorage.build
+
+class NodeStorage:
+    """
+    The original engine: a dict of Node objects, each holding a list of its neighboring Nodes.
+    Neighbor lists are ordered by the bit that is flipped, most significant bit first.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.nodes_adjacency = {} # Node : neighbors[Node]
+        self.decimal_Node_dict = {} # decimal value : Node
+        self.edge_count = n * 2**(n - 1)
+        self.build()
+
+    def build(self):
+        """O(n2^n), but the neighbor values come from one vectorized pass (converted a block at a time to bound memory)."""
+        n = self.n
+        nodes = [Node(d, n) for d in range(2**n)]
+        self.decimal_Node_dict = dict(enumerate(nodes))
+        table, lookup = hypercube_table(n), nodes.__getitem__
+        self.nodes_adjacency = {}
+        for start in range(0, 2**n, BUILD_BLOCK):
+            rows = table[start:start + BUILD_BLOCK].tolist()
+            self.nodes_adjacency.update(zip(nodes[start:start + BUILD_BLOCK], [list(map(lookup, row)) for row in rows]))
+
+    def vertices(self):
+        return self.decimal_Node_dict.keys()
+
+    def neighbors(self, v):
+        return [node.value for node in self.nodes_adjacency[self.decimal_Node_dict[v]]]
+
+    def edge_mask(self, v):
+        """Bit i is set iff the edge v -- v ^ (1 << i) is present."""
+        return sum(v ^ node.value for node in self.nodes_adjacency[self.decimal_Node_dict[v]])
+
+    def has_edge(self, u, v):
+        return self.decimal_Node_dict[v] in self.nodes_adjacency[self.decimal_Node_dict[u]]
+
+    def remove_edge(self, u, v):
+        u_node, v_node = self.decimal_Node_dict[u], self.decimal_Node_dict[v]
+        self.nodes_adjacency[u_node].remove(v_node)
+        self.nodes_adjacency[v_node].remove(u_node)
+        self.edge_count -= 1
+
+    def remove_edges(self, lows, highs):
+        for u, v in zip(lows.tolist(), highs.tolist()):
+            self.remove_edge(u, v)
+
+    def num_edges(self):
+        return self.edge_count
+
+    def edge_masks(self):
+        masks = np.zeros(2**self.n, dtype=mask_dtype(self.n))
+        for node, neighbors in self.nodes_adjacency.items():
+            masks[node.value] = sum(node.value ^ neighbor.value for neighbor in neighbors)
+        return masks
+
+class MaskStorage:
+    """
+    Compact engine: a flat integer array holding one n-bit edge mask per vertex. Bit i of masks[v] is set
+    iff the edge v -- v ^ (1 << i) is present, so a 20 dimensional cube costs 4MB instead of millions of objects.
+    Neighbors are produced in the same order as NodeStorage (most significant bit first).
+    """
+
+    def __init__(self, n, masks=None, edge_count=None):
+        """
+        masks: an existing mask array (shared memory, a memmap, ...) to use in place instead of a full cube.
+        edge_count: its number of edges if already known, which saves reading every mask.
+        """
+        self.n = n
+        self.full = 2**n - 1
+        if masks is None:
+            self.masks = np.full(2**n, self.full, dtype=mask_dtype(n)) # every vertex starts with all n edges
+            self.edge_count = n * 2**(n - 1)
+        else:
+            self.masks = masks
+            self.edge_count = int(popcount(masks).sum(dtype=np.int64)) // 2 if edge_count is None else edge_count
+
+    def vertices(self):
+        return range(2**self.n)
+
+    def neighbors(self, v):
+        neighbors = []
+        mask = int(self.masks[v])
+        while mask:
+            bit = 1 << (mask.bit_length() - 1) # highest remaining bit
+            neighbors.append(v ^ bit)
+            mask ^= bit
+        return neighbors
+
+    def edge_mask(self, v):
+        return int(self.masks[v])
+
+    def has_edge(self, u, v):
+        return bool(int(self.masks[u]) & (u ^ v))
+
+    def remove_edge(self, u, v):
+        bit = u ^ v
+        self.masks[u] &= self.full ^ bit
+        self.masks[v] &= self.full ^ bit
+        self.edge_count -= 1
+
+    def remove_edges(self, lows, highs):
+        """Bulk removal of distinct present edges lows[i] -- highs[i]."""
+        bits = (lows ^ highs).astype(np.float64) # a vertex loses each bit at most once, so summing bits ORs them (exact below 2^53)
+        size = len(self.masks)
+        cleared = np.bincount(lows, bits, size) + np.bincount(highs, bits, size)
+        self.masks &= ~cleared.astype(self.masks.dtype)
+        self.edge_count -= len(lows)
+
+    def num_edges(self):
+        return self.edge_count
+
+    def edge_masks(self):
+        return self.masks
+
+def edge_key(u, v):
+    """Key of the undirected edge u -- v: the endpoint with the flipped bit cleared, and the flipped dimension."""
+    bit = u ^ v
+    return ((u & ~bit) << 6) | (bit.bit_length() - 1) # (min(u, v), dim) packed into one int, dim < 64
+
+def clear_removed(masks, removed):
+    """Clears the edges whose edge_key is in removed from masks, in place. Returns masks."""
+    keys = np.fromiter(removed, dtype=np.uint64, count=len(removed))
+    lows, bits = keys >> np.uint64(6), (np.uint64(1) << (keys & np.uint64(63))).astype(masks.dtype)
+    np.bitwise_and.at(masks, lows, ~bits)
+    np.bitwise_and.at(masks, lows ^ bits, ~bits)
+    return masks
+
+class ImplicitStorage:
+    """
+    Lazy engine for cubes too large to materialize (n up to 64). The full hypercube is implied by bit flips and
+    only removed edges are stored, as a set of edge_key ints. Memory is O(removed edges); searches only touch
+    the vertices they visit.
+    """
+
+    def __init__(self, n):
+        if n > 64:
+            raise ValueError(f'{n} dimensions do not fit in a 64 bit edge mask')
+        self.n = n
+        self.removed = set() # edge_key(u, v) of every deleted edge
+
+    def vertices(self):
+        return range(2**self.n)
+
+    def neighbors(self, v):
+        neighbors = []
+        for dim in range(self.n - 1, -1, -1): # most significant bit first
+            bit = 1 << dim
+            if ((v & ~bit) << 6) | dim not in self.removed:
+                neighbors.append(v ^ bit)
+        return neighbors
+
+    def edge_mask(self, v):
+        mask = 2**self.n - 1
+        if self.removed:
+            for dim in range(self.n):
+                if ((v & ~(1 << dim)) << 6) | dim in self.removed:
+                    mask ^= 1 << dim
+        return mask
+
+    def has_edge(self, u, v):
+        return edge_key(u, v) not in self.removed
+
+    def remove_edge(self, u, v):
+        self.removed.add(edge_key(u, v))
+
+    def remove_edges(self, lows, highs):
+        self.removed.update(map(edge_key, lows.tolist(), highs.tolist())) # python ints, keys outgrow 64 bits past n = 58
+
+    def num_edges(self):
+        return self.n * 2**(self.n - 1) - len(self.removed)
+
+    def edge_masks(self):
+        """Materializes every vertex's edge mask, only sensible for cubes that fit in memory."""
+        return clear_removed(np.full(2**self.n, 2**self.n - 1, dtype=mask_dtype(self.n)), self.removed)
+
+class OverlayStorage:
+    """
+    Copy-on-write snapshot of another storage. The base is shared and never written; the overlay only records the
+    edges it removed (as edge_key ints), so thousands of damaged variants can share one base cube.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.n = base.n
+        self.removed = set() # edge_key(u, v) of every edge deleted in this snapshot
+        self.edge_count = base.num_edges()
+
+    def vertices(self):
+        return self.base.vertices()
+
+    def neighbors(self, v):
+        neighbors = self.base.neighbors(v)
+        if not self.removed:
+            return neighbors
+        return [u for u in neighbors if edge_key(v, u) not in self.removed]
+
+    def edge_mask(self, v):
+        mask = self.base.edge_mask(v)
+        if self.removed:
+            for u in self.base.neighbors(v):
+                if edge_key(v, u) in self.removed:
+                    mask ^= v ^ u
+        return mask
+
+    def has_edge(self, u, v):
+        return edge_key(u, v) not in self.removed and self.base.has_edge(u, v)
+
+    def remove_edge(self, u, v):
+        self.removed.add(edge_key(u, v))
+        self.edge_count -= 1
+
+    def remove_edges(self, lows, highs):
+        self.removed.update(map(edge_key, lows.tolist(), highs.tolist()))
+        self.edge_count -= len(lows)
+
+    def num_edges(self):
+        return self.edge_count
+
+    def edge_masks(self):
+        return clear_removed(self.base.edge_masks().copy(), self.removed)
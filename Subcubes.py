@@ -0,0 +1,167 @@
+import numpy as np
+import Bits
+from Components import label_components
+from Fringe import BucketFringe
+from PathResult import PathResult, trace
+from Storage import MaskStorage
+
+class SubcubeIndex:
+    """
+    Two level routing index. The top k bits of a vertex pick one of 2^k subcubes of dimension m = n - k. A cluster
+    is a connected component of a subcube under its own (low dimension) edges, labelled by its smallest vertex, and
+    the abstract graph links two clusters when some crossing (high dimension) edge joins them. In a hypercube every
+    vertex is on its subcube's boundary, so instead of HPA*'s boundary-to-boundary tables each cluster is treated as
+    internally connected and only its crossings are counted.
+    A query runs a vectorized BFS over the abstract graph from the target's cluster, giving every cluster its fewest
+    crossings to it; unreachable targets are answered there. A* then runs guided by max(popcount(v ^ t), crossings
+    still needed from v's cluster), which is admissible and consistent (each edge changes either term by at most 1)
+    and, on heavily damaged cubes, far tighter than Hamming distance alone, so the path found is a shortest path.
+    The index listens to the graph: removed edges mark their subcubes, which are relabelled and have their crossings
+    recounted on the next query, leaving the rest of the index alone.
+    """
+
+    def __init__(self, graph, k=None):
+        self.graph = graph
+        n = graph.n
+        self.k = n // 2 if k is None else k
+        self.m = n - self.k
+        dtype = Bits.mask_dtype(n)
+        low = dtype.type((1 << self.m) - 1)
+        masks = graph._materialized_masks()
+        self.labels = label_components(masks & low, n) # vertex : its cluster
+        self.adjacent = {} # cluster : {neighboring cluster : crossing edges between them}
+        lows, highs = Bits.edge_list(masks & ~low, n)
+        self._count(self.labels[lows], self.labels[highs])
+        self.dirty = set() # subcubes with removed edges, rebuilt on the next query
+        self.abstract = None # the abstract graph as arrays for queries, see _compact
+        self.nodes_expanded = 0 # vertices expanded by the last refinement
+        graph.listeners.append(self._removed)
+
+    def _count(self, a, b):
+        """Adds crossing edges between clusters a[i] and b[i] to the abstract graph."""
+        if not len(a):
+            return
+        n = self.graph.n # the cube fits in memory, so a pair of vertex ids fits in 64 bits
+        pairs, counts = np.unique((a.astype(np.uint64) << np.uint64(n)) | b.astype(np.uint64), return_counts=True)
+        low = np.uint64(2**n - 1)
+        for u, v, count in zip((pairs >> np.uint64(n)).tolist(), (pairs & low).tolist(), counts.tolist()):
+            self.adjacent.setdefault(u, {})[v] = self.adjacent.get(u, {}).get(v, 0) + count
+            self.adjacent.setdefault(v, {})[u] = self.adjacent.get(v, {}).get(u, 0) + count
+
+    def _removed(self, lows, highs):
+        self.dirty.update((np.asarray(lows) >> np.uint64(self.m)).tolist())
+        self.dirty.update((np.asarray(highs) >> np.uint64(self.m)).tolist())
+
+    def _rebuild(self):
+        """Relabels every dirty subcube and recounts the crossings out of it."""
+        m, size = self.m, 2**self.m
+        dtype = Bits.mask_dtype(self.graph.n)
+        storage = self.graph.storage
+        live = storage.edge_masks() if isinstance(storage, MaskStorage) else None # other engines build masks per call
+        sub_masks = {}
+        for s in self.dirty:
+            base = s << m
+            for cluster in np.unique(self.labels[base:base + size]).tolist():
+                for other in self.adjacent.pop(cluster, {}):
+                    self.adjacent.get(other, {}).pop(cluster, None)
+            if live is not None:
+                masks = live[base:base + size].copy()
+            else:
+                masks = np.fromiter(map(storage.edge_mask, range(base, base + size)), dtype, count=size)
+            self.labels[base:base + size] = label_components(masks & dtype.type(size - 1), m) + dtype.type(base)
+            sub_masks[s] = masks
+        for s, masks in sub_masks.items():
+            vertices = np.arange(s << m, (s + 1) << m, dtype=dtype)
+            ends, others = [], []
+            for j in range(self.k):
+                other = s ^ (1 << j)
+                if other in sub_masks and other < s: # counted from the other side
+                    continue
+                end = vertices[(masks >> dtype.type(m + j)) & 1 == 1]
+                ends.append(end)
+                others.append(end ^ dtype.type(1 << (m + j)))
+            if ends:
+                self._count(self.labels[np.concatenate(ends)], self.labels[np.concatenate(others)])
+        self.dirty.clear()
+        self.abstract = None
+
+    def _compact(self):
+        """
+        The abstract graph in compressed sparse rows over dense cluster ids: (slot, indptr, indices), slot[label]
+        being the dense id of the cluster labelled label. Built on the first query after a change.
+        """
+        labels = self.labels
+        roots = np.flatnonzero(labels == np.arange(len(labels), dtype=labels.dtype)) # a cluster's label is its smallest vertex
+        slot = np.full(len(labels), -1, dtype=np.int32)
+        slot[roots] = np.arange(len(roots), dtype=np.int32)
+        counts = np.zeros(len(roots) + 1, dtype=np.int64)
+        ends = []
+        for c, others in self.adjacent.items():
+            counts[slot.item(c) + 1] = len(others)
+            ends.append(list(others))
+        indptr = np.cumsum(counts)
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        for c, others in zip(self.adjacent, ends):
+            start = indptr.item(slot.item(c))
+            indices[start:start + len(others)] = slot[others]
+        return slot, indptr, indices
+
+    def _crossings_field(self, target):
+        """Fewest crossings from every cluster to cluster target by dense id (-1 when cut off). Vectorized BFS."""
+        if self.abstract is None:
+            self.abstract = self._compact()
+        slot, indptr, indices = self.abstract
+        dist = np.full(len(indptr) - 1, -1, dtype=np.int32)
+        frontier = slot[[target]]
+        dist[frontier] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            reached = indices[offsets]
+            dist[reached[dist[reached] < 0]] = level
+            frontier = np.flatnonzero(dist == level) # without the repeats
+        return dist
+
+    def shortest_path(self, start, target):
+        """A shortest path from start to target (bitstrings or vertex values) as a PathResult, see the class docstring."""
+        if self.dirty:
+            self._rebuild()
+        graph = self.graph
+        s_d, t_d = graph._vertex(start), graph._vertex(target)
+        labels = self.labels
+        cs, ct = labels.item(s_d), labels.item(t_d)
+        self.nodes_expanded = 0
+        to_t = self._crossings_field(ct)
+        slot = self.abstract[0]
+        if to_t.item(slot.item(cs)) < 0:
+            return PathResult(s_d, t_d, None, graph.n)
+        return PathResult(s_d, t_d, self._refine(s_d, t_d, to_t), graph.n)
+
+    def _refine(self, s_d, t_d, to_t):
+        """
+        A* from s_d to t_d, which is known to be reachable, guided by to_t (fewest crossings to t_d's cluster by dense
+        cluster id, see _crossings_field).
+        """
+        INF = float('inf')
+        labels, neighbors, slot = self.labels, self.graph.storage.neighbors, self.abstract[0]
+        fringe = BucketFringe()
+        fringe.push(s_d, max((s_d ^ t_d).bit_count(), to_t.item(slot.item(labels.item(s_d)))))
+        distTo = {s_d : 0}
+        edgeTo = {}
+        while fringe:
+            c_d = fringe.pop()
+            self.nodes_expanded += 1
+            if c_d == t_d:
+                return trace(edgeTo, s_d, t_d, distTo[t_d] + 1, Bits.mask_dtype(self.graph.n))
+            g = distTo[c_d] + 1
+            for n_d in neighbors(c_d):
+                if g < distTo.get(n_d, INF): # n_d shares s_d's component, so its cluster reaches t_d's
+                    distTo[n_d] = g
+                    edgeTo[n_d] = c_d
+                    fringe.push(n_d, g + max((n_d ^ t_d).bit_count(), to_t.item(slot.item(labels.item(n_d)))))
+        return None
+
+    def close(self):
+        self.graph.listeners.remove(self._removed)
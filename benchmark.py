@@ -0,0 +1,140 @@
+"""
+Benchmarks graph building, damage and path queries across dimensions and damage levels.
+
+python benchmark.py --dims 8-20 --damage 0.1,0.3,0.5 --output results.json
+python benchmark.py --dims 8-20 --baseline results.json    # flags anything slower than the stored run
+
+Damage is the fraction of the cube's n2^(n-1) edges removed. Times are in seconds; build, subgraph and memory are per
+graph, path, fast_path (path(fast=True)) and shortest_path are means over --queries random (start, target) pairs. Peak memory is measured in a
+separate tracemalloc pass so it does not skew the timings. --landmarks K also builds K landmarks after the first
+shortest_path pass and reruns it, adding their build time and bytes and the nodes expanded with them.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from Graph import Graph
+
+TIMED = ('build', 'subgraph', 'path', 'fast_path', 'shortest_path') # metrics compared against a baseline
+
+def parse_dims(text):
+    """'8-24' -> 8..24, '8,12,16' -> those, '8-24:4' -> every 4th."""
+    dims = []
+    for part in text.split(','):
+        span, _, step = part.partition(':')
+        low, _, high = span.partition('-')
+        dims.extend(range(int(low), int(high or low) + 1, int(step or 1)))
+    return dims
+
+def damaged(n, damage, engine, seed, legacy):
+    graph = Graph(n, seed, engine)
+    graph.subgraph(int(damage * n * 2**(n - 1)), vectorized=not legacy)
+    return graph
+
+def run_case(n, damage, engine, queries, seed, legacy, landmarks=0):
+    result = {'n': n, 'damage': damage, 'engine': engine}
+    start = time.perf_counter()
+    graph = Graph(n, seed, engine)
+    result['build'] = time.perf_counter() - start
+    start = time.perf_counter()
+    graph.subgraph(int(damage * n * 2**(n - 1)), vectorized=not legacy)
+    result['subgraph'] = time.perf_counter() - start
+
+    rand = random.Random(seed)
+    pairs = [(graph.bitstr(rand.randrange(2**n)), graph.bitstr(rand.randrange(2**n))) for _ in range(queries)]
+    start = time.perf_counter()
+    found = sum(graph.path(s, t).found for s, t in pairs)
+    result['path'] = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for s, t in pairs:
+        graph.path(s, t, fast=True)
+    result['fast_path'] = (time.perf_counter() - start) / queries
+    expanded = 0
+    start = time.perf_counter()
+    for s, t in pairs:
+        graph.shortest_path(s, t)
+        expanded += graph.nodes_expanded
+    result['shortest_path'] = (time.perf_counter() - start) / queries
+    result['nodes_expanded'] = expanded / queries
+    result['reachable'] = found / queries
+    if landmarks:
+        index = graph.landmarks(landmarks)
+        result['landmark_time'] = index.build_time
+        result['landmark_bytes'] = index.nbytes
+        expanded = 0
+        start = time.perf_counter()
+        for s, t in pairs:
+            graph.shortest_path(s, t)
+            expanded += graph.nodes_expanded
+        result['alt_shortest_path'] = (time.perf_counter() - start) / queries
+        result['alt_nodes_expanded'] = expanded / queries
+
+    tracemalloc.start()
+    damaged(n, damage, engine, seed, legacy)
+    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+def compare(results, baseline, tolerance, min_delta):
+    """Returns a line for every timed metric that got more than tolerance (and min_delta seconds) slower than in baseline."""
+    old = {(case['n'], case['damage'], case['engine']) : case for case in baseline['results']}
+    regressions = []
+    for case in results:
+        before = old.get((case['n'], case['damage'], case['engine']))
+        if before is None:
+            continue
+        for metric in TIMED:
+            if metric not in before: # older baselines lack metrics added since
+                continue
+            if case[metric] > before[metric] * (1 + tolerance) and case[metric] - before[metric] > min_delta:
+                regressions.append(f"n={case['n']} damage={case['damage']} {metric}: "
+                                   f"{before[metric]:.6f}s -> {case[metric]:.6f}s ({case[metric] / before[metric]:.2f}x)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dims', default='8-20', help="dimensions, e.g. '8-24', '8,12,16' or '8-24:4'")
+    parser.add_argument('--damage', default='0.1,0.3,0.5', help='comma separated fractions of edges removed')
+    parser.add_argument('--engine', default='mask', help="storage engine: 'dict', 'mask' or 'implicit'")
+    parser.add_argument('--queries', type=int, default=50, help='random (start, target) pairs per case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--landmarks', type=int, default=0, help='also time shortest_path with this many landmarks')
+    parser.add_argument('--legacy-subgraph', action='store_true', help='damage with the random.Random sampler')
+    parser.add_argument('--output', help='write the results as JSON to this file (default: stdout)')
+    parser.add_argument('--baseline', help='JSON from an earlier run to check for regressions against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before flagging, 0.25 = 25%%')
+    parser.add_argument('--min-delta', type=float, default=1e-3, help='ignore slowdowns smaller than this many seconds')
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in parse_dims(args.dims):
+        for damage in map(float, args.damage.split(',')):
+            case = run_case(n, damage, args.engine, args.queries, args.seed, args.legacy_subgraph, args.landmarks)
+            print(f"n={n:2d} damage={damage:.2f} build={case['build']:.4f}s subgraph={case['subgraph']:.4f}s "
+                  f"path={case['path']:.6f}s fast_path={case['fast_path']:.6f}s shortest_path={case['shortest_path']:.6f}s "
+                  f"expanded={case['nodes_expanded']:.0f} peak={case['peak_memory'] / 2**20:.1f}MB", file=sys.stderr)
+            if args.landmarks:
+                print(f"n={n:2d} damage={damage:.2f} landmarks={args.landmarks} build={case['landmark_time']:.4f}s "
+                      f"bytes={case['landmark_bytes']} shortest_path={case['alt_shortest_path']:.6f}s "
+                      f"expanded={case['nodes_expanded']:.0f}->{case['alt_nodes_expanded']:.0f}", file=sys.stderr)
+            results.append(case)
+
+    report = {'python': sys.version.split()[0], 'args': vars(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())